@@ -2,69 +2,219 @@
 API 路由 - 订阅转换接口
 """
 
+import re
 import uuid
+import asyncio
+import time
 import hashlib
-from datetime import datetime
+import yaml
+import httpx
+import orjson
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from urllib.parse import quote
 from typing import Optional, Dict, Any
 from fastapi import APIRouter, HTTPException, Query, Request
-from fastapi.responses import PlainTextResponse, JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from ..models.schemas import (
     ConversionRequest, ConversionResponse, HealthResponse,
     TargetFormat, ErrorResponse
 )
-from ..core.converter import SubscriptionConverter
+from ..core.converter import get_subscription_converter
 from ..core.performance.cache_manager import get_cache_manager
 from ..utils.helpers import validate_url, sanitize_filename
 
-router = APIRouter()
-converter = SubscriptionConverter()
+
+class FastJSONResponse(JSONResponse):
+    """使用 orjson 序列化的 JSON 响应"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+@dataclass(slots=True)
+class CachedConfig:
+    """缓存的转换结果"""
+    config: str
+    config_bytes: bytes  # 预先编码的 YAML 内容，下载时无需重复编码
+    timestamp: float
+    nodes_count: int
+    filename: Optional[str]  # 用户自定义文件名
+    content_disposition: str
+    etag: str
+    config_json: Optional[Dict[str, Any]] = None  # JSON 形式在首次请求时惰性生成
+
+
+router = APIRouter(default_response_class=FastJSONResponse)
+converter = get_subscription_converter()
+
+# 功能特性信息是静态的，启动时计算并序列化一次
+_FEATURES = converter.get_clash_meta_features()
+_PROTOCOLS = {
+    "protocols": _FEATURES["supported_protocols"],
+    "networks": _FEATURES["supported_networks"],
+    "proxy_groups": _FEATURES["proxy_group_types"]
+}
+_FEATURES_BODY = FastJSONResponse(content=_FEATURES).body
+_PROTOCOLS_BODY = FastJSONResponse(content=_PROTOCOLS).body
 
 # 使用专业的缓存管理器替代简单的内存字典
 cache_manager = get_cache_manager()
 
+# 优先使用 libyaml 的 C 实现加载器，不可用时回退到纯 Python 实现
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
-@router.post("/convert", response_model=ConversionResponse)
-async def convert_subscription(request: ConversionRequest):
+# 订阅链接格式校验（转换接口快速路径，在 C 实现的正则引擎中完成匹配）
+_URL_RE = re.compile(r'^https?://[^\s/$.?#][^\s]*$', re.IGNORECASE)
+
+# 后台缓存写入任务（持有引用，避免任务在完成前被回收）
+_background_tasks: set = set()
+
+# 链接验证共享的 HTTP 客户端，复用连接池避免每次请求重新握手
+_validate_client: Optional[httpx.AsyncClient] = None
+
+
+def get_validate_client() -> httpx.AsyncClient:
+    """获取（必要时创建）链接验证使用的共享 HTTP 客户端"""
+    global _validate_client
+    if _validate_client is None or _validate_client.is_closed:
+        _validate_client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=30)
+        )
+    return _validate_client
+
+
+async def close_http_clients():
+    """关闭共享的 HTTP 客户端，在应用关闭时调用"""
+    global _validate_client
+    if _validate_client is not None:
+        await _validate_client.aclose()
+        _validate_client = None
+    await converter.aclose()
+
+
+def _make_config_id(url) -> str:
     """
-    转换订阅接口
+    根据订阅链接生成配置 ID
     
-    接受订阅链接和配置参数，返回转换后的配置
+    使用 BLAKE2b（6 字节摘要，即 12 位十六进制）逐段写入哈希器，
+    避免为多个链接拼接中间字符串
+    """
+    hasher = hashlib.blake2b(digest_size=6)
+    if isinstance(url, list):
+        for i, part in enumerate(url):
+            if i:
+                hasher.update(b"|")
+            hasher.update(part.encode())
+    else:
+        hasher.update(url.encode())
+    return hasher.hexdigest()
+
+
+def _first_invalid_url(urls) -> Optional[str]:
+    """返回第一个格式无效的链接，全部有效时返回 None"""
+    return next((u for u in urls if not _URL_RE.fullmatch(u)), None)
+
+
+def _schedule_cache_write(config_id: str, cache_data: CachedConfig, ttl: Optional[float] = None):
+    """
+    在后台线程中写入配置缓存，不阻塞转换接口的响应
+    
+    下载接口在缓存写入完成前会返回 404，客户端重试即可
+    """
+    task = asyncio.create_task(
+        asyncio.to_thread(cache_manager.set, 'generated_config', config_id, cache_data, ttl)
+    )
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def _build_cached_config(config_id: str,
+                         config: str,
+                         nodes_count: int,
+                         filename: Optional[str] = None) -> CachedConfig:
+    """根据转换结果构建缓存项，下载所需的响应头在此一次性生成"""
+    timestamp = time.time()
+    return CachedConfig(
+        config=config,
+        config_bytes=config.encode('utf-8'),
+        timestamp=timestamp,
+        nodes_count=nodes_count,
+        filename=filename,
+        content_disposition=_build_disposition(filename, config_id),
+        # 同一链接重新转换后内容可能变化，ETag 同时包含生成时间
+        etag=f'"{config_id}-{int(timestamp * 1000):x}"'
+    )
+
+
+def _build_disposition(filename: Optional[str], config_id: str) -> str:
+    """
+    构建下载响应的 Content-Disposition 头
+    
+    Args:
+        filename: 用户自定义文件名，为空时使用默认文件名
+        config_id: 配置 ID
+    """
+    default_filename = f"clash_config_{config_id}.yml"
+    if not filename:
+        return f'attachment; filename="{default_filename}"'
+    
+    safe_filename = sanitize_filename(filename)
+    if not safe_filename.endswith(('.yaml', '.yml')):
+        safe_filename += '.yml'
+    
+    if safe_filename.isascii():
+        return f'attachment; filename="{safe_filename}"'
+    
+    # 非 ASCII 文件名按 RFC 5987 编码，同时提供 ASCII 的默认文件名作为兼容回退
+    return f"attachment; filename=\"{default_filename}\"; filename*=UTF-8''{quote(safe_filename)}"
+
+
+async def _do_convert(request: ConversionRequest) -> ConversionResponse:
+    """
+    执行转换流程：验证链接 -> 转换订阅 -> 缓存结果 -> 生成下载链接
+    
+    POST 和 GET 两个转换接口共用此流程
     """
+    # 验证输入参数
+    urls = request.url if isinstance(request.url, list) else (request.url,)
+    invalid_url = _first_invalid_url(urls)
+    if invalid_url is not None:
+        raise HTTPException(status_code=400, detail=f"无效的 URL: {invalid_url}")
+    
     try:
-        # 验证输入参数
-        if isinstance(request.url, list):
-            for url in request.url:
-                if not validate_url(url):
-                    raise HTTPException(status_code=400, detail=f"无效的 URL: {url}")
-        else:
-            if not validate_url(request.url):
-                raise HTTPException(status_code=400, detail=f"无效的 URL: {request.url}")
-        
         # 执行转换
         result = await converter.convert_subscription(request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if result.success and result.config:
+        # 生成配置 ID 并缓存结果
+        config_id = _make_config_id(request.url)
         
-        if result.success and result.config:
-            # 生成配置 ID 并缓存结果
-            config_id = hashlib.md5(str(request.url).encode()).hexdigest()[:12]
-            
-            cache_data = {
-                'config': result.config,
-                'timestamp': datetime.now(),
-                'nodes_count': result.nodes_count,
-                'filename': request.filename  # 存储用户自定义文件名
-            }
-            
-            # 使用专业缓存管理器存储，TTL为180秒
-            cache_manager.set('generated_config', config_id, cache_data)
-            
-            # 生成下载链接（考虑nginx路径前缀）
-            result.download_url = f"/clash/api/sub/{config_id}"
+        cache_data = _build_cached_config(
+            config_id, result.config, result.nodes_count, request.filename
+        )
         
-        return result
+        # 使用专业缓存管理器存储，TTL为180秒（后台写入，不计入响应耗时）
+        _schedule_cache_write(config_id, cache_data)
         
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        # 生成下载链接（考虑nginx路径前缀）
+        result.download_url = f"/clash/api/sub/{config_id}"
+    
+    return result
+
+
+@router.post("/convert", response_model=ConversionResponse)
+async def convert_subscription(request: ConversionRequest):
+    """
+    转换订阅接口
+    
+    接受订阅链接和配置参数，返回转换后的配置
+    """
+    return await _do_convert(request)
 
 
 @router.get("/convert", response_model=ConversionResponse)
@@ -87,10 +237,10 @@ async def convert_subscription_get(
     
     支持通过 URL 参数传递转换配置
     """
+    # 解析 URL 列表
+    url_list = [u.strip() for u in url.split('|') if u.strip()]
+    
     try:
-        # 解析 URL 列表
-        url_list = [u.strip() for u in url.split('|') if u.strip()]
-        
         # 构建转换请求
         request = ConversionRequest(
             url=url_list,
@@ -106,16 +256,16 @@ async def convert_subscription_get(
             fdn=fdn,
             sort=sort
         )
-        
-        return await convert_subscription(request)
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return await _do_convert(request)
 
 
 @router.get("/sub/{config_id}")
 async def download_config(
     config_id: str,
+    request: Request,
     format: Optional[str] = Query(None, description="输出格式: yaml/json"),
     filename: Optional[str] = Query(None, description="文件名")
 ):
@@ -130,39 +280,45 @@ async def download_config(
     cached_data = cache_manager.get('generated_config', config_id)
     if cached_data is None:
         raise HTTPException(status_code=404, detail="配置不存在或已过期")
-    config_content = cached_data['config']
     
     # 确定响应格式
     if format == 'json':
-        import yaml
-        try:
-            config_dict = yaml.safe_load(config_content)
-            return JSONResponse(content=config_dict)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"配置格式转换失败: {str(e)}")
+        config_dict = cached_data.config_json
+        if config_dict is None:
+            try:
+                config_dict = yaml.load(cached_data.config, Loader=_YAML_LOADER)
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"配置格式转换失败: {str(e)}")
+            
+            # 记录解析结果，后续 JSON 下载无需重复解析 YAML；内存后端返回的就是缓存中的对象，
+            # 赋值即完成记忆化，其余后端保存的是副本，按剩余 TTL 在后台回写，不延长过期时间
+            cached_data.config_json = config_dict
+            if not cache_manager.shares_references:
+                remaining_ttl = cache_manager.get_ttl('generated_config') - (time.time() - cached_data.timestamp)
+                if remaining_ttl > 0:
+                    _schedule_cache_write(config_id, cached_data, remaining_ttl)
+        
+        return FastJSONResponse(content=config_dict)
     
-    # 默认返回 YAML 格式
-    response = PlainTextResponse(
-        content=config_content,
-        media_type="text/plain; charset=utf-8"
+    # 客户端轮询同一订阅时，内容未变化则直接返回 304，不再传输配置内容
+    cache_headers = {"ETag": cached_data.etag, "Cache-Control": "private, max-age=180"}
+    if request.headers.get("if-none-match") == cached_data.etag:
+        return Response(status_code=304, headers=cache_headers)
+    
+    # 默认返回 YAML 格式，直接使用写入缓存时预先编码的字节内容
+    response = Response(
+        content=cached_data.config_bytes,
+        media_type="text/plain; charset=utf-8",
+        headers=cache_headers
     )
     
-    # 设置下载文件名，优先使用缓存中的文件名
+    # 设置下载文件名：查询参数优先，其次使用转换时预先生成的响应头
     if filename:
-        # 查询参数中提供的文件名
-        safe_filename = sanitize_filename(filename)
-        if not safe_filename.endswith(('.yaml', '.yml')):
-            safe_filename += '.yml'
-    elif cached_data.get('filename'):
-        # 使用缓存中存储的用户自定义文件名
-        safe_filename = sanitize_filename(cached_data['filename'])
-        if not safe_filename.endswith(('.yaml', '.yml')):
-            safe_filename += '.yml'
+        content_disposition = _build_disposition(filename, config_id)
     else:
-        # 使用默认文件名
-        safe_filename = f"clash_config_{config_id}.yml"
+        content_disposition = cached_data.content_disposition
     
-    response.headers["Content-Disposition"] = f'attachment; filename="{safe_filename}"'
+    response.headers["Content-Disposition"] = content_disposition
     
     return response
 
@@ -181,8 +337,8 @@ async def get_config_info(config_id: str):
     
     return {
         "config_id": config_id,
-        "nodes_count": cached_data['nodes_count'],
-        "created_at": cached_data['timestamp'].isoformat(),
+        "nodes_count": cached_data.nodes_count,
+        "created_at": datetime.fromtimestamp(cached_data.timestamp, tz=timezone.utc).isoformat(),
         "download_url": f"/clash/api/sub/{config_id}"
     }
 
@@ -192,7 +348,7 @@ async def get_supported_features():
     """
     获取支持的功能特性
     """
-    return converter.get_clash_meta_features()
+    return Response(content=_FEATURES_BODY, media_type="application/json")
 
 
 @router.get("/protocols")
@@ -200,12 +356,7 @@ async def get_supported_protocols():
     """
     获取支持的协议列表
     """
-    features = converter.get_clash_meta_features()
-    return {
-        "protocols": features["supported_protocols"],
-        "networks": features["supported_networks"],
-        "proxy_groups": features["proxy_group_types"]
-    }
+    return Response(content=_PROTOCOLS_BODY, media_type="application/json")
 
 
 @router.post("/validate")
@@ -216,37 +367,37 @@ async def validate_subscription_url(urls: list[str]):
     Args:
         urls: 要验证的订阅链接列表
     """
-    results = []
+    client = get_validate_client()
     
-    for url in urls:
+    async def _check(url: str) -> Dict[str, Any]:
+        if not validate_url(url):
+            return {
+                "url": url,
+                "valid": False,
+                "error": "URL 格式无效"
+            }
+        
         try:
-            if not validate_url(url):
-                results.append({
-                    "url": url,
-                    "valid": False,
-                    "error": "URL 格式无效"
-                })
-                continue
-            
             # 尝试获取订阅内容（仅获取头部信息）
-            import httpx
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.head(url, follow_redirects=True)
-                
-                results.append({
-                    "url": url,
-                    "valid": response.status_code == 200,
-                    "status_code": response.status_code,
-                    "content_type": response.headers.get("content-type", ""),
-                    "content_length": response.headers.get("content-length", "")
-                })
-                
+            response = await client.head(url, follow_redirects=True)
+            
+            return {
+                "url": url,
+                "valid": response.status_code == 200,
+                "status_code": response.status_code,
+                "content_type": response.headers.get("content-type", ""),
+                "content_length": response.headers.get("content-length", "")
+            }
+        
         except Exception as e:
-            results.append({
+            return {
                 "url": url,
                 "valid": False,
                 "error": str(e)
-            })
+            }
+    
+    # 并发验证所有链接，总耗时取决于最慢的一个而非全部之和
+    results = await asyncio.gather(*[_check(url) for url in urls])
     
     return {"results": results}
 
@@ -1,3 +1,3 @@
 from .parser import SubscriptionParser
 from .rules import RuleProcessor
-from .converter import SubscriptionConverter
\ No newline at end of file
+from .converter import SubscriptionConverter, get_subscription_converter
\ No newline at end of file
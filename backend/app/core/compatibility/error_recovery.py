@@ -5,18 +5,58 @@
 
 import asyncio
 import logging
+import random
+import re
 import time
 import traceback
-from typing import Any, Dict, List, Optional, Callable, Union, Type
-from dataclasses import dataclass
-from enum import Enum
+from typing import Any, Dict, List, Optional, Callable, Union, Type, Tuple
+from dataclasses import dataclass, field
+from enum import Enum, IntEnum
 import functools
+import gc
+import io
+import itertools
+import httpx
+from collections import OrderedDict, defaultdict
 from contextlib import asynccontextmanager
 
 from .version_manager import get_version_manager, CompatibilityLevel
 from ..performance.cache_manager import get_cache_manager
 
 
+# 重试退避的最大延迟（秒），避免高重试次数时延迟无限增长
+MAX_BACKOFF = 60.0
+
+# 熔断器恢复等待时间的上限（秒）
+MAX_RECOVERY_TIMEOUT = 600.0
+
+# 保留的熔断器数量上限，超出时淘汰最久未使用的
+MAX_CIRCUIT_BREAKERS = 1024
+
+# 可重试的 HTTP 状态码及网络相关关键字
+_HTTP_RETRY_RE = re.compile(
+    r'\b(?:502|503|504|408|429|500)\b|timeout|connection|network|dns',
+    re.IGNORECASE
+)
+_RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+# 视为超时的异常类型
+_TIMEOUT_ERRORS = (TimeoutError, asyncio.TimeoutError, httpx.TimeoutException)
+
+# 配置生成失败时返回的基础配置模板
+_FALLBACK_CONFIG = """# Fallback Configuration
+# Generated due to error in primary config generation
+
+proxies: []
+proxy-groups:
+  - name: "PROXY"
+    type: select
+    proxies: ["DIRECT"]
+rules:
+  - MATCH,PROXY
+"""
+
+
 class RecoveryStrategy(str, Enum):
     """恢复策略"""
     RETRY = "retry"                    # 重试
@@ -34,7 +74,7 @@ class ErrorSeverity(str, Enum):
     CRITICAL = "critical"             # 严重：系统无法正常工作
 
 
-@dataclass
+@dataclass(slots=True)
 class ErrorContext:
     """错误上下文"""
     error: Exception
@@ -45,16 +85,35 @@ class ErrorContext:
     metadata: Dict[str, Any] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class RecoveryRule:
     """恢复规则"""
-    error_types: List[Type[Exception]]
+    error_types: Tuple[Type[Exception], ...]
     strategy: RecoveryStrategy
     max_retries: int = 3
     retry_delay: float = 1.0
     backoff_factor: float = 2.0
+    jitter_factor: float = 1.0  # 1.0 为完全抖动，0 为不抖动
     fallback_func: Optional[Callable] = None
     condition_func: Optional[Callable] = None  # 判断是否应用此规则的条件
+    fallback_is_coro: bool = field(init=False, default=False)
+
+    def __post_init__(self):
+        self.error_types = tuple(self.error_types)
+        # 回退函数类型在创建规则时确定，避免每次回退都检查
+        self.fallback_is_coro = asyncio.iscoroutinefunction(self.fallback_func)
+
+
+class CircuitState(IntEnum):
+    """熔断器状态"""
+    CLOSED = 0                        # 正常
+    OPEN = 1                          # 熔断
+    HALF_OPEN = 2                     # 半开，允许探测
+
+
+class CircuitOpenError(Exception):
+    """熔断器处于打开状态时抛出"""
+    pass
 
 
 class CircuitBreaker:
@@ -63,56 +122,95 @@ class CircuitBreaker:
     def __init__(self, 
                  failure_threshold: int = 5,
                  recovery_timeout: float = 60.0,
-                 expected_exception: Type[Exception] = Exception):
+                 expected_exception: Type[Exception] = Exception,
+                 max_recovery_timeout: float = MAX_RECOVERY_TIMEOUT):
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
+        self.max_recovery_timeout = max(max_recovery_timeout, recovery_timeout)
         self.expected_exception = expected_exception
         
         self.failure_count = 0
-        self.last_failure_time = None
-        self.state = 'CLOSED'  # CLOSED, OPEN, HALF_OPEN
+        self.last_failure_time = None  # 单调时钟，用于恢复判断
+        self.last_failure_at = None  # 墙上时间，仅用于展示
+        self.consecutive_opens = 0  # 连续打开次数，用于计算指数退避的恢复等待时间
+        self.state = CircuitState.CLOSED
+        self.on_change: Optional[Callable[[], None]] = None  # 状态变化通知（用于统计缓存失效）
         self.logger = logging.getLogger("recovery.circuit_breaker")
 
     def __call__(self, func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                self._before_call(func)
+                try:
+                    result = await func(*args, **kwargs)
+                except self.expected_exception:
+                    self._on_failure()
+                    raise
+                self._on_success()
+                return result
+            
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            if self.state == 'OPEN':
-                if self._should_attempt_reset():
-                    self.state = 'HALF_OPEN'
-                else:
-                    raise Exception(f"Circuit breaker is OPEN for {func.__name__}")
-            
+            self._before_call(func)
             try:
                 result = func(*args, **kwargs)
-                self._on_success()
-                return result
-            except self.expected_exception as e:
+            except self.expected_exception:
                 self._on_failure()
-                raise e
+                raise
+            self._on_success()
+            return result
         
         return wrapper
 
+    def _before_call(self, func):
+        """调用前检查熔断状态"""
+        if self.state == CircuitState.OPEN:
+            if self._should_attempt_reset():
+                self.state = CircuitState.HALF_OPEN
+                self._notify_change()
+            else:
+                raise CircuitOpenError(f"Circuit breaker is OPEN for {func.__name__}")
+
     def _should_attempt_reset(self) -> bool:
         """检查是否应该尝试重置"""
         if self.last_failure_time is None:
             return True
-        return time.time() - self.last_failure_time >= self.recovery_timeout
+        return time.monotonic() - self.last_failure_time >= self._effective_recovery_timeout()
+
+    def _effective_recovery_timeout(self) -> float:
+        """半开探测失败后，恢复等待时间按指数增长直至上限"""
+        exponent = max(self.consecutive_opens - 1, 0)
+        return min(self.recovery_timeout * (2 ** exponent), self.max_recovery_timeout)
+
+    def _notify_change(self):
+        """通知状态变化"""
+        if self.on_change is not None:
+            self.on_change()
 
     def _on_success(self):
         """成功回调"""
-        if self.state == 'HALF_OPEN':
-            self.state = 'CLOSED'
+        if self.state == CircuitState.HALF_OPEN:
+            self.state = CircuitState.CLOSED
             self.failure_count = 0
+            self.consecutive_opens = 0
+            self._notify_change()
             self.logger.info("熔断器已重置为 CLOSED 状态")
 
     def _on_failure(self):
         """失败回调"""
         self.failure_count += 1
-        self.last_failure_time = time.time()
+        self.last_failure_time = time.monotonic()
+        self.last_failure_at = time.time()
+        self._notify_change()
         
         if self.failure_count >= self.failure_threshold:
-            self.state = 'OPEN'
-            self.logger.warning(f"熔断器已切换为 OPEN 状态，失败次数: {self.failure_count}")
+            if self.state != CircuitState.OPEN:
+                self.consecutive_opens += 1
+            self.state = CircuitState.OPEN
+            self.logger.warning("熔断器已切换为 OPEN 状态，失败次数: %d", self.failure_count)
 
 
 class ErrorRecoveryManager:
@@ -125,17 +223,20 @@ class ErrorRecoveryManager:
         
         # 恢复规则
         self.recovery_rules = self._initialize_recovery_rules()
+        self._rules_by_type = self._build_rule_index(self.recovery_rules)
+        self._rule_cache: Dict[type, List[RecoveryRule]] = {}
         
-        # 熔断器实例
-        self.circuit_breakers = {}
+        # 熔断器实例（LRU）
+        self.circuit_breakers: "OrderedDict[str, CircuitBreaker]" = OrderedDict()
+        self._circuit_breaker_stats: Optional[Dict[str, Any]] = None  # 熔断器统计缓存
         
         # 错误统计
         self.error_stats = {
             'total_errors': 0,
             'recovered_errors': 0,
             'failed_recoveries': 0,
-            'by_type': {},
-            'by_operation': {}
+            'by_type': defaultdict(int),
+            'by_operation': defaultdict(int)
         }
 
     def _initialize_recovery_rules(self) -> List[RecoveryRule]:
@@ -143,7 +244,7 @@ class ErrorRecoveryManager:
         return [
             # 网络相关错误 - 重试策略
             RecoveryRule(
-                error_types=[ConnectionError, TimeoutError, OSError],
+                error_types=(ConnectionError, TimeoutError, OSError),
                 strategy=RecoveryStrategy.RETRY,
                 max_retries=3,
                 retry_delay=1.0,
@@ -152,7 +253,7 @@ class ErrorRecoveryManager:
             
             # HTTP 错误 - 根据状态码决定策略
             RecoveryRule(
-                error_types=[Exception],  # 会通过 condition_func 进一步过滤
+                error_types=(Exception,),  # 会通过 condition_func 进一步过滤
                 strategy=RecoveryStrategy.RETRY,
                 max_retries=2,
                 retry_delay=0.5,
@@ -161,21 +262,21 @@ class ErrorRecoveryManager:
             
             # 解析错误 - 降级策略
             RecoveryRule(
-                error_types=[ValueError, KeyError, TypeError],
+                error_types=(ValueError, KeyError, TypeError),
                 strategy=RecoveryStrategy.DEGRADE,
                 fallback_func=self._parse_error_fallback
             ),
             
             # 内存不足 - 降级策略
             RecoveryRule(
-                error_types=[MemoryError],
+                error_types=(MemoryError,),
                 strategy=RecoveryStrategy.DEGRADE,
                 fallback_func=self._memory_error_fallback
             ),
             
             # 配置生成错误 - 回退策略
             RecoveryRule(
-                error_types=[Exception],
+                error_types=(Exception,),
                 strategy=RecoveryStrategy.FALLBACK,
                 condition_func=lambda ctx: 'generate_config' in ctx.operation,
                 fallback_func=self._config_generation_fallback
@@ -183,40 +284,82 @@ class ErrorRecoveryManager:
             
             # 未知错误 - 记录并忽略
             RecoveryRule(
-                error_types=[Exception],
+                error_types=(Exception,),
                 strategy=RecoveryStrategy.IGNORE,
                 condition_func=lambda ctx: ctx.severity == ErrorSeverity.LOW
             )
         ]
 
+    @staticmethod
+    def _build_rule_index(rules: List[RecoveryRule]) -> Dict[type, List[tuple]]:
+        """构建 错误类型 -> (规则序号, 规则) 的索引"""
+        index: Dict[type, List[tuple]] = {}
+        for order, rule in enumerate(rules):
+            for error_type in rule.error_types:
+                index.setdefault(error_type, []).append((order, rule))
+        return index
+
+    def _candidate_rules(self, error_type: type) -> List[RecoveryRule]:
+        """按规则定义顺序返回匹配该错误类型的候选规则（按类型缓存）"""
+        candidates = self._rule_cache.get(error_type)
+        if candidates is None:
+            matched = {}
+            for cls in error_type.__mro__:
+                for order, rule in self._rules_by_type.get(cls, ()):
+                    matched.setdefault(order, rule)
+            candidates = [matched[order] for order in sorted(matched)]
+            self._rule_cache[error_type] = candidates
+        return candidates
+
     def get_circuit_breaker(self, operation: str) -> CircuitBreaker:
         """获取或创建熔断器"""
-        if operation not in self.circuit_breakers:
-            self.circuit_breakers[operation] = CircuitBreaker()
-        return self.circuit_breakers[operation]
+        cb = self.circuit_breakers.get(operation)
+        if cb is None:
+            cb = CircuitBreaker()
+            self.register_circuit_breaker(operation, cb)
+        else:
+            self.circuit_breakers.move_to_end(operation)
+        return cb
+
+    def register_circuit_breaker(self, operation: str, cb: CircuitBreaker):
+        """注册熔断器，超出数量上限时淘汰最久未使用的"""
+        cb.on_change = self._invalidate_circuit_breaker_stats
+        self.circuit_breakers[operation] = cb
+        self.circuit_breakers.move_to_end(operation)
+        while len(self.circuit_breakers) > MAX_CIRCUIT_BREAKERS:
+            self.circuit_breakers.popitem(last=False)
+        self._invalidate_circuit_breaker_stats()
+
+    def _invalidate_circuit_breaker_stats(self):
+        """熔断器状态变化时使统计缓存失效"""
+        self._circuit_breaker_stats = None
 
     async def execute_with_recovery(self,
                                   operation: str,
                                   func: Callable,
                                   *args,
                                   severity: ErrorSeverity = ErrorSeverity.MEDIUM,
+                                  is_coroutine: Optional[bool] = None,
                                   **kwargs) -> Any:
         """带恢复机制地执行函数"""
+        if is_coroutine is None:
+            is_coroutine = asyncio.iscoroutinefunction(func)
         attempts = 0
         last_error = None
+        circuit_breaker = self.get_circuit_breaker(operation)
+        max_attempts = 1  # 首次失败后由匹配的恢复规则确定
         
-        while attempts < 10:  # 最大尝试次数限制
+        while attempts < max_attempts:
             attempts += 1
             
             try:
                 # 检查熔断器
-                circuit_breaker = self.get_circuit_breaker(operation)
-                if circuit_breaker.state == 'OPEN':
+                if circuit_breaker.state == CircuitState.OPEN:
                     if not circuit_breaker._should_attempt_reset():
-                        raise Exception(f"Operation '{operation}' is circuit-broken")
+                        raise CircuitOpenError(f"Operation '{operation}' is circuit-broken")
                 
                 # 执行函数
-                if asyncio.iscoroutinefunction(func):
+                if is_coroutine:
                     result = await func(*args, **kwargs)
                 else:
                     result = func(*args, **kwargs)
@@ -240,19 +383,30 @@ class ErrorRecoveryManager:
                     error=e,
                     operation=operation,
                     attempts=attempts,
-                    max_attempts=10,
-                    severity=severity,
-                    metadata={'args': args, 'kwargs': kwargs}
+                    max_attempts=max_attempts,
+                    severity=severity
                 )
                 
                 # 查找适用的恢复规则
                 rule = self._find_recovery_rule(error_context)
                 if not rule:
-                    self.logger.error(f"未找到适用的恢复规则: {operation}, {type(e).__name__}")
+                    self.logger.error("未找到适用的恢复规则: %s, %s", operation, type(e).__name__)
                     break
                 
+                # 只有重试策略需要多次尝试，其余策略只执行一次
+                if attempts == 1:
+                    if rule.strategy == RecoveryStrategy.RETRY:
+                        max_attempts = max(rule.max_retries, 1)
+                    error_context.max_attempts = max_attempts
+                
+                # 仅在回退函数可能读取时才附带调用参数
+                if rule.fallback_func:
+                    error_context.metadata = {'args': args, 'kwargs': kwargs}
+                
                 # 应用恢复策略
-                recovery_result = await self._apply_recovery_strategy(error_context, rule, func, *args, **kwargs)
+                recovery_result = await self._apply_recovery_strategy(
+                    error_context, rule, func, is_coroutine, *args, **kwargs
+                )
                 
                 if recovery_result.get('success'):
                     return recovery_result.get('result')
@@ -265,16 +419,12 @@ class ErrorRecoveryManager:
         
         # 所有恢复尝试都失败了
         self.error_stats['failed_recoveries'] += 1
-        self.logger.error(f"恢复失败，操作: {operation}, 最后错误: {last_error}")
+        self.logger.error("恢复失败，操作: %s, 最后错误: %s", operation, last_error)
         raise last_error
 
     def _find_recovery_rule(self, context: ErrorContext) -> Optional[RecoveryRule]:
         """查找适用的恢复规则"""
-        for rule in self.recovery_rules:
-            # 检查错误类型
-            if not any(isinstance(context.error, error_type) for error_type in rule.error_types):
-                continue
-            
+        for rule in self._candidate_rules(type(context.error)):
             # 检查条件函数
             if rule.condition_func and not rule.condition_func(context):
                 continue
@@ -287,6 +437,7 @@ class ErrorRecoveryManager:
                                      context: ErrorContext,
                                      rule: RecoveryRule,
                                      func: Callable,
+                                     func_is_coro: bool,
                                      *args,
                                      **kwargs) -> Dict[str, Any]:
         """应用恢复策略"""
@@ -297,7 +448,7 @@ class ErrorRecoveryManager:
             return await self._handle_fallback_strategy(context, rule, func, *args, **kwargs)
         
         elif rule.strategy == RecoveryStrategy.DEGRADE:
-            return await self._handle_degrade_strategy(context, rule, func, *args, **kwargs)
+            return await self._handle_degrade_strategy(context, rule, func, func_is_coro, *args, **kwargs)
         
         elif rule.strategy == RecoveryStrategy.IGNORE:
             return await self._handle_ignore_strategy(context, rule)
@@ -310,13 +461,17 @@ class ErrorRecoveryManager:
     async def _handle_retry_strategy(self, context: ErrorContext, rule: RecoveryRule) -> Dict[str, Any]:
         """处理重试策略"""
         if context.attempts >= rule.max_retries:
-            self.logger.warning(f"重试次数已达上限: {context.operation}")
+            self.logger.warning("重试次数已达上限: %s", context.operation)
             return {'success': False, 'should_stop': True}
         
-        # 计算延迟时间（指数退避）
-        delay = rule.retry_delay * (rule.backoff_factor ** (context.attempts - 1))
+        # 计算延迟时间（指数退避 + 抖动），避免并发调用方同时重试
+        delay = min(rule.retry_delay * (rule.backoff_factor ** (context.attempts - 1)), MAX_BACKOFF)
+        if rule.jitter_factor >= 1.0:
+            delay = random.uniform(0, delay)
+        elif rule.jitter_factor > 0:
+            delay *= 1 - rule.jitter_factor * random.random()
         
-        self.logger.info(f"重试操作 '{context.operation}' (第{context.attempts}次)，延迟 {delay:.2f}s")
+        self.logger.info("重试操作 '%s' (第%d次)，延迟 %.2fs", context.operation, context.attempts, delay)
         await asyncio.sleep(delay)
         
         return {'success': False, 'should_retry': True}
@@ -329,13 +484,13 @@ class ErrorRecoveryManager:
                                       **kwargs) -> Dict[str, Any]:
         """处理回退策略"""
         if not rule.fallback_func:
-            self.logger.error(f"回退策略缺少回退函数: {context.operation}")
+            self.logger.error("回退策略缺少回退函数: %s", context.operation)
             return {'success': False, 'should_stop': True}
         
         try:
-            self.logger.info(f"使用回退方案: {context.operation}")
+            self.logger.info("使用回退方案: %s", context.operation)
             
-            if asyncio.iscoroutinefunction(rule.fallback_func):
+            if rule.fallback_is_coro:
                 result = await rule.fallback_func(context, *args, **kwargs)
             else:
                 result = rule.fallback_func(context, *args, **kwargs)
@@ -343,23 +498,24 @@ class ErrorRecoveryManager:
             return {'success': True, 'result': result}
         
         except Exception as e:
-            self.logger.error(f"回退方案也失败了: {e}")
+            self.logger.error("回退方案也失败了: %s", e)
             return {'success': False, 'should_stop': True}
 
     async def _handle_degrade_strategy(self,
                                      context: ErrorContext,
                                      rule: RecoveryRule,
                                      func: Callable,
+                                     func_is_coro: bool,
                                      *args,
                                      **kwargs) -> Dict[str, Any]:
         """处理降级策略"""
         try:
-            self.logger.info(f"启用降级模式: {context.operation}")
+            self.logger.info("启用降级模式: %s", context.operation)
             
             # 使用降级后的参数重新执行
             degraded_args, degraded_kwargs = self._get_degraded_parameters(context, *args, **kwargs)
             
-            if asyncio.iscoroutinefunction(func):
+            if func_is_coro:
                 result = await func(*degraded_args, **degraded_kwargs)
             else:
                 result = func(*degraded_args, **degraded_kwargs)
@@ -367,61 +523,53 @@ class ErrorRecoveryManager:
             return {'success': True, 'result': result}
         
         except Exception as e:
-            self.logger.error(f"降级模式也失败了: {e}")
+            self.logger.error("降级模式也失败了: %s", e)
             if rule.fallback_func:
                 return await self._handle_fallback_strategy(context, rule, func, *args, **kwargs)
             return {'success': False, 'should_stop': True}
 
     async def _handle_ignore_strategy(self, context: ErrorContext, rule: RecoveryRule) -> Dict[str, Any]:
         """处理忽略策略"""
-        self.logger.warning(f"忽略错误: {context.operation} - {context.error}")
+        self.logger.warning("忽略错误: %s - %s", context.operation, context.error)
         return {'success': True, 'result': None}
 
     async def _handle_abort_strategy(self, context: ErrorContext, rule: RecoveryRule) -> Dict[str, Any]:
         """处理中止策略"""
-        self.logger.error(f"中止操作: {context.operation} - {context.error}")
+        self.logger.error("中止操作: %s - %s", context.operation, context.error)
         return {'success': False, 'should_stop': True}
 
     def _get_degraded_parameters(self, context: ErrorContext, *args, **kwargs):
         """获取降级后的参数"""
-        # 根据错误类型和操作类型调整参数
-        degraded_kwargs = kwargs.copy()
-        
+        # 根据错误类型和操作类型调整参数，仅在需要修改时才复制 kwargs
         if isinstance(context.error, MemoryError):
             # 内存不足时减少处理量
+            degraded_kwargs = dict(kwargs)
             degraded_kwargs['batch_size'] = min(degraded_kwargs.get('batch_size', 50), 10)
             degraded_kwargs['enable_compression'] = False
+            return args, degraded_kwargs
         
-        elif 'timeout' in str(context.error).lower():
+        if isinstance(context.error, _TIMEOUT_ERRORS):
             # 超时错误时增加超时时间
+            degraded_kwargs = dict(kwargs)
             degraded_kwargs['timeout'] = degraded_kwargs.get('timeout', 30) * 2
+            return args, degraded_kwargs
         
-        elif isinstance(context.error, (ValueError, KeyError, TypeError)):
+        if isinstance(context.error, (ValueError, KeyError, TypeError)):
             # 解析错误时启用兼容模式
+            degraded_kwargs = dict(kwargs)
             degraded_kwargs['strict_mode'] = False
             degraded_kwargs['ignore_errors'] = True
+            return args, degraded_kwargs
         
-        return args, degraded_kwargs
+        return args, kwargs
 
     def _is_retryable_http_error(self, error: Exception) -> bool:
         """判断HTTP错误是否可重试"""
-        error_str = str(error).lower()
-        
-        # 可重试的状态码
-        retryable_codes = ['502', '503', '504', '408', '429', '500']
-        
-        for code in retryable_codes:
-            if code in error_str:
-                return True
-        
-        # 网络相关错误
-        retryable_keywords = ['timeout', 'connection', 'network', 'dns']
-        
-        for keyword in retryable_keywords:
-            if keyword in error_str:
-                return True
-        
-        return False
+        # 带响应的 HTTP 异常直接根据状态码判断
+        status_code = getattr(getattr(error, 'response', None), 'status_code', None)
+        if isinstance(status_code, int):
+            return status_code in _RETRYABLE_STATUS_CODES
+        return bool(_HTTP_RETRY_RE.search(str(error)))
 
     def _parse_error_fallback(self, context: ErrorContext, *args, **kwargs) -> Any:
         """解析错误的回退方案"""
@@ -431,10 +579,12 @@ class ErrorRecoveryManager:
         if hasattr(context, 'metadata') and context.metadata:
             raw_data = context.metadata.get('raw_data')
             if raw_data:
-                # 简单的行分割和基础验证
-                lines = raw_data.strip().split('\n')
-                valid_lines = [line for line in lines if line.strip() and '://' in line]
-                return valid_lines[:10]  # 限制数量
+                # 逐行扫描，取到前 10 条有效链接即停止
+                valid_lines = (
+                    line for line in map(str.strip, io.StringIO(raw_data))
+                    if line and '://' in line
+                )
+                return list(itertools.islice(valid_lines, 10))
         
         return []
 
@@ -442,8 +592,10 @@ class ErrorRecoveryManager:
         """内存不足的回退方案"""
         self.logger.warning("内存不足，启用精简模式")
         
-        # 清理缓存
-        self.cache_manager.memory_cache.clear()
+        # 按淘汰策略释放一半缓存，保留热点数据，避免随后大量请求同时未命中
+        evicted = self.cache_manager.memory_cache.trim(0.5)
+        gc.collect()
+        self.logger.info("已淘汰 %d 个缓存项", evicted)
         
         # 返回精简结果
         return {'status': 'degraded', 'message': '由于内存限制，返回精简结果'}
@@ -453,29 +605,13 @@ class ErrorRecoveryManager:
         self.logger.info("使用简化配置模板")
         
         # 返回基础的配置模板
-        return """# Fallback Configuration
-# Generated due to error in primary config generation
-
-proxies: []
-proxy-groups:
-  - name: "PROXY"
-    type: select
-    proxies: ["DIRECT"]
-rules:
-  - MATCH,PROXY
-"""
+        return _FALLBACK_CONFIG
 
     def _update_error_stats(self, error: Exception, operation: str):
         """更新错误统计"""
         self.error_stats['total_errors'] += 1
         
-        error_type = type(error).__name__
-        if error_type not in self.error_stats['by_type']:
-            self.error_stats['by_type'][error_type] = 0
-        self.error_stats['by_type'][error_type] += 1
-        
-        if operation not in self.error_stats['by_operation']:
-            self.error_stats['by_operation'][operation] = 0
+        self.error_stats['by_type'][type(error).__name__] += 1
         self.error_stats['by_operation'][operation] += 1
 
     def get_error_stats(self) -> Dict[str, Any]:
@@ -483,17 +619,23 @@ rules:
         total = self.error_stats['total_errors']
         recovered = self.error_stats['recovered_errors']
         
-        return {
-            **self.error_stats,
-            'recovery_rate': recovered / total if total > 0 else 0.0,
-            'circuit_breakers': {
+        # 熔断器部分仅在状态变化后重建
+        if self._circuit_breaker_stats is None:
+            self._circuit_breaker_stats = {
                 name: {
-                    'state': cb.state,
+                    'state': cb.state.name,
                     'failure_count': cb.failure_count,
-                    'last_failure_time': cb.last_failure_time
+                    'last_failure_time': cb.last_failure_at
                 }
                 for name, cb in self.circuit_breakers.items()
             }
+        
+        return {
+            **self.error_stats,
+            'by_type': dict(self.error_stats['by_type']),
+            'by_operation': dict(self.error_stats['by_operation']),
+            'recovery_rate': recovered / total if total > 0 else 0.0,
+            'circuit_breakers': self._circuit_breaker_stats
         }
 
     @asynccontextmanager
@@ -502,8 +644,13 @@ rules:
         try:
             yield
         except Exception as e:
-            self.logger.error(f"错误边界捕获异常: {operation} - {e}")
-            self.logger.debug(traceback.format_exc())
+            if severity == ErrorSeverity.LOW:
+                # 低严重程度的错误数量多，仅在 DEBUG 级别下格式化堆栈
+                self.logger.error("错误边界捕获异常: %s - %s", operation, e)
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("stack:\n%s", traceback.format_exc())
+            else:
+                self.logger.exception("错误边界捕获异常: %s - %s", operation, e)
             
             # 根据严重程度决定是否重新抛出
             if severity in [ErrorSeverity.HIGH, ErrorSeverity.CRITICAL]:
@@ -516,10 +663,13 @@ rules:
         """手动重置熔断器"""
         if operation in self.circuit_breakers:
             cb = self.circuit_breakers[operation]
-            cb.state = 'CLOSED'
+            cb.state = CircuitState.CLOSED
             cb.failure_count = 0
+            cb.consecutive_opens = 0
             cb.last_failure_time = None
-            self.logger.info(f"手动重置熔断器: {operation}")
+            cb.last_failure_at = None
+            self._invalidate_circuit_breaker_stats()
+            self.logger.info("手动重置熔断器: %s", operation)
 
     def reset_all_circuit_breakers(self):
         """重置所有熔断器"""
@@ -527,12 +677,15 @@ rules:
             self.reset_circuit_breaker(operation)
 
 
-# 全局错误恢复管理器
-global_error_recovery = ErrorRecoveryManager()
+# 全局错误恢复管理器（首次使用时创建）
+global_error_recovery: Optional[ErrorRecoveryManager] = None
 
 
 def get_error_recovery_manager() -> ErrorRecoveryManager:
     """获取全局错误恢复管理器"""
+    global global_error_recovery
+    if global_error_recovery is None:
+        global_error_recovery = ErrorRecoveryManager()
     return global_error_recovery
 
 
@@ -540,11 +693,13 @@ def get_error_recovery_manager() -> ErrorRecoveryManager:
 def with_error_recovery(operation: str, severity: ErrorSeverity = ErrorSeverity.MEDIUM):
     """错误恢复装饰器"""
     def decorator(func):
+        is_coro = asyncio.iscoroutinefunction(func)
+
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             recovery_manager = get_error_recovery_manager()
             return await recovery_manager.execute_with_recovery(
-                operation, func, *args, severity=severity, **kwargs
+                operation, func, *args, severity=severity, is_coroutine=is_coro, **kwargs
             )
         return wrapper
     return decorator
@@ -557,6 +712,6 @@ def circuit_breaker(operation: str,
     def decorator(func):
         recovery_manager = get_error_recovery_manager()
         cb = CircuitBreaker(failure_threshold, recovery_timeout)
-        recovery_manager.circuit_breakers[operation] = cb
+        recovery_manager.register_circuit_breaker(operation, cb)
         return cb(func)
     return decorator
\ No newline at end of file
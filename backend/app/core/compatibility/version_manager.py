@@ -3,16 +3,57 @@
 处理协议版本兼容性和向后兼容性问题
 """
 
+import functools
 import logging
-from typing import Dict, Any, List, Optional, Union, Callable
+import re
+import sys
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Union, Callable, Tuple, Mapping
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from packaging import version as pkg_version
+from packaging.version import InvalidVersion
 
 from ..protocol_parser_interface import ProtocolVersion
 from ...models.schemas import ProxyNode, ProxyType
 
 
+@functools.lru_cache(maxsize=1024)
+def _parse_version(ver: str) -> Optional[pkg_version.Version]:
+    """解析版本号（带缓存），无法解析时返回 None
+
+    协议版本号集合很小，缓存后反复解析同一字符串（包括无效字符串）都只需一次查表
+    """
+    if not isinstance(ver, str):
+        return None
+    try:
+        return pkg_version.parse(ver)
+    except InvalidVersion:
+        return None
+
+
+@functools.lru_cache(maxsize=256)
+def _canon_protocol(protocol: str) -> str:
+    """协议名规范化为小写（带缓存），避免每次调用都分配新字符串"""
+    return sys.intern(protocol.lower())
+
+
+# 形如 "5"、"1.2"、"1.2.3.4" 的纯数字版本号
+_NUMERIC_VERSION_RE = re.compile(r'^[0-9]+(?:\.[0-9]+){0,3}$')
+
+
+@functools.lru_cache(maxsize=1024)
+def _encode_version(ver: str) -> Optional[int]:
+    """将纯数字版本号编码为整数（每段 16 位），无法编码时返回 None"""
+    if not isinstance(ver, str) or not _NUMERIC_VERSION_RE.match(ver):
+        return None
+    parts = [int(part) for part in ver.split('.')]
+    if any(part > 0xFFFF for part in parts):
+        return None
+    parts += [0] * (4 - len(parts))
+    return (parts[0] << 48) | (parts[1] << 32) | (parts[2] << 16) | parts[3]
+
+
 class CompatibilityLevel(str, Enum):
     """兼容性级别"""
     FULL = "full"           # 完全兼容
@@ -21,26 +62,207 @@ class CompatibilityLevel(str, Enum):
     INCOMPATIBLE = "incompatible"  # 不兼容
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class VersionInfo:
     """版本信息"""
     protocol: str
     version: str
-    features: List[str]
-    deprecated_features: List[str] = None
-    removed_features: List[str] = None
+    features: Tuple[str, ...]
+    deprecated_features: Optional[Tuple[str, ...]] = None
+    removed_features: Optional[Tuple[str, ...]] = None
     migration_notes: str = ""
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CompatibilityRule:
     """兼容性规则"""
     source_version: str
     target_version: str
     compatibility_level: CompatibilityLevel
-    field_mappings: Dict[str, str] = None
+    field_mappings: Optional[Dict[str, Optional[str]]] = field(default=None, hash=False)
     transformation_func: Optional[Callable] = None
-    warnings: List[str] = None
+    warnings: Optional[Tuple[str, ...]] = None
+
+
+# 协议版本信息
+_PROTOCOL_VERSIONS: Mapping[str, Mapping[str, VersionInfo]] = MappingProxyType({
+    "hysteria": MappingProxyType({
+        "1": VersionInfo(
+            protocol="hysteria",
+            version="1",
+            features=("auth", "obfs", "fast_open", "lazy_start"),
+            deprecated_features=("lazy_start",),
+            migration_notes="Hysteria v1 已被 v2 取代，建议升级"
+        ),
+        "2": VersionInfo(
+            protocol="hysteria",
+            version="2",
+            features=("auth", "obfs", "brutal", "salamander"),
+            removed_features=("lazy_start", "fast_open"),
+            migration_notes="Hysteria v2 使用新的认证和混淆机制"
+        )
+    }),
+    "tuic": MappingProxyType({
+        "4": VersionInfo(
+            protocol="tuic",
+            version="4",
+            features=("token", "congestion_control", "disable_sni"),
+            deprecated_features=("token",),
+            migration_notes="TUIC v4 使用 token 认证"
+        ),
+        "5": VersionInfo(
+            protocol="tuic",
+            version="5",
+            features=("uuid", "password", "congestion_control", "udp_relay_mode", "reduce_rtt"),
+            removed_features=("token", "disable_sni"),
+            migration_notes="TUIC v5 改用 UUID+Password 认证模式"
+        )
+    }),
+    "vless": MappingProxyType({
+        "1": VersionInfo(
+            protocol="vless",
+            version="1",
+            features=("uuid", "flow", "encryption", "transport", "tls", "xtls", "reality"),
+            migration_notes="VLESS 是 VMess 的轻量级版本"
+        )
+    }),
+    "wireguard": MappingProxyType({
+        "1": VersionInfo(
+            protocol="wireguard",
+            version="1",
+            features=("private_key", "public_key", "preshared_key", "allowed_ips", "endpoint"),
+            migration_notes="WireGuard 是现代 VPN 协议"
+        )
+    })
+})
+
+# 兼容性规则
+_COMPATIBILITY_RULES: Mapping[str, Tuple[CompatibilityRule, ...]] = MappingProxyType({
+    "hysteria": (
+        CompatibilityRule(
+            source_version="1",
+            target_version="2",
+            compatibility_level=CompatibilityLevel.PARTIAL,
+            field_mappings={
+                "auth_str": "auth",
+                "obfs": "obfs",
+                "up": "up_mbps",
+                "down": "down_mbps"
+            },
+            warnings=("fast_open 和 lazy_start 功能在 v2 中不支持",)
+        ),
+        CompatibilityRule(
+            source_version="2",
+            target_version="1",
+            compatibility_level=CompatibilityLevel.DEGRADED,
+            field_mappings={
+                "auth": "auth_str",
+                "up_mbps": "up",
+                "down_mbps": "down"
+            },
+            warnings=("brutal 和 salamander 混淆在 v1 中不支持",)
+        )
+    ),
+    "tuic": (
+        CompatibilityRule(
+            source_version="4",
+            target_version="5",
+            compatibility_level=CompatibilityLevel.PARTIAL,
+            field_mappings={
+                "token": "uuid",  # token 映射到 uuid
+                "disable_sni": None,  # 移除该字段
+            },
+            warnings=("需要同时设置 password 字段", "disable_sni 功能已移除")
+        ),
+        CompatibilityRule(
+            source_version="5",
+            target_version="4",
+            compatibility_level=CompatibilityLevel.DEGRADED,
+            field_mappings={
+                "uuid": "token",
+                "password": None,  # v4 不支持独立密码
+                "udp_relay_mode": None,
+                "reduce_rtt": None
+            },
+            warnings=("password、udp_relay_mode、reduce_rtt 功能在 v4 中不支持",)
+        )
+    )
+})
+
+# 字段映射规则
+_FIELD_MAPPINGS: Mapping[str, Mapping[str, Optional[str]]] = MappingProxyType({
+    "clash_to_singbox": MappingProxyType({
+        "server": "server",
+        "port": "server_port",
+        "cipher": "method",
+        "uuid": "uuid",
+        "alterId": "alter_id",
+        "skip-cert-verify": "tls.insecure",
+        "sni": "tls.server_name",
+        "network": "transport.type",
+        "ws-opts.path": "transport.path",
+        "ws-opts.headers.Host": "transport.headers.Host",
+        "h2-opts.path": "transport.path",
+        "h2-opts.host": "transport.host",
+        "grpc-opts.grpc-service-name": "transport.service_name"
+    }),
+    "singbox_to_clash": MappingProxyType({
+        "server": "server",
+        "server_port": "port",
+        "method": "cipher",
+        "uuid": "uuid",
+        "alter_id": "alterId",
+        "tls.insecure": "skip-cert-verify",
+        "tls.server_name": "sni",
+        "transport.type": "network",
+        "transport.path": "ws-opts.path",
+        "transport.headers.Host": "ws-opts.headers.Host",
+        "transport.host": "h2-opts.host",
+        "transport.service_name": "grpc-opts.grpc-service-name"
+    })
+})
+
+
+# ProxyNode 的字段集合，迁移时用于判断字段是否存在
+_PROXY_NODE_FIELDS = frozenset(ProxyNode.model_fields)
+
+# 基础必需字段
+_BASE_REQUIRED_FIELDS: Tuple[str, ...] = ("name", "server", "port")
+
+# 协议特定必需字段（tuic 依版本而定，单独处理）
+_PROTOCOL_REQUIRED_FIELDS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "hysteria": ("auth", "up_mbps", "down_mbps"),
+    "hysteria2": ("auth", "up_mbps", "down_mbps"),
+    "vless": ("uuid",),
+    "vmess": ("uuid",),
+    "trojan": ("password",),
+    "ss": ("method", "password"),
+    "ssr": ("method", "password", "protocol", "obfs"),
+    "wireguard": ("private_key", "peer_public_key")
+})
+
+
+@functools.lru_cache(maxsize=256)
+def _required_fields(protocol: str, version: str, format_type: str) -> Tuple[str, ...]:
+    """
+    计算必需字段（带缓存）
+
+    缓存键来自请求中的协议/版本字符串，使用有界缓存避免任意输入导致无限增长
+    """
+    # 基础必需字段 + 协议特定字段
+    if protocol == "tuic":
+        protocol_fields = ("uuid", "password") if version == "5" else ("token",)
+    else:
+        protocol_fields = _PROTOCOL_REQUIRED_FIELDS.get(protocol, ())
+    fields = _BASE_REQUIRED_FIELDS + protocol_fields
+
+    # 根据格式调整字段名
+    if format_type == "sing-box":
+        # sing-box 使用不同的字段名
+        field_mapping = _FIELD_MAPPINGS.get("clash_to_singbox", {})
+        fields = tuple(field_mapping.get(field, field) for field in fields)
+
+    return fields
 
 
 class VersionManager:
@@ -49,159 +271,34 @@ class VersionManager:
     def __init__(self):
         self.logger = logging.getLogger("compatibility.version")
         
-        # 协议版本信息
-        self.protocol_versions = self._initialize_protocol_versions()
+        # 协议版本信息（模块级只读常量，多个实例/预加载的工作进程共享）
+        self.protocol_versions = _PROTOCOL_VERSIONS
         
-        # 兼容性规则
-        self.compatibility_rules = self._initialize_compatibility_rules()
+        # 兼容性规则，及按 (源版本, 目标版本) 建立的索引
+        self.compatibility_rules = _COMPATIBILITY_RULES
+        self._rule_index: Dict[str, Dict[Tuple[str, str], CompatibilityRule]] = {
+            protocol: {(rule.source_version, rule.target_version): rule for rule in rules}
+            for protocol, rules in self.compatibility_rules.items()
+        }
         
         # 字段映射规则
-        self.field_mappings = self._initialize_field_mappings()
-
-    def _initialize_protocol_versions(self) -> Dict[str, Dict[str, VersionInfo]]:
-        """初始化协议版本信息"""
-        return {
-            "hysteria": {
-                "1": VersionInfo(
-                    protocol="hysteria",
-                    version="1",
-                    features=["auth", "obfs", "fast_open", "lazy_start"],
-                    deprecated_features=["lazy_start"],
-                    migration_notes="Hysteria v1 已被 v2 取代，建议升级"
-                ),
-                "2": VersionInfo(
-                    protocol="hysteria",
-                    version="2",
-                    features=["auth", "obfs", "brutal", "salamander"],
-                    removed_features=["lazy_start", "fast_open"],
-                    migration_notes="Hysteria v2 使用新的认证和混淆机制"
-                )
-            },
-            "tuic": {
-                "4": VersionInfo(
-                    protocol="tuic",
-                    version="4",
-                    features=["token", "congestion_control", "disable_sni"],
-                    deprecated_features=["token"],
-                    migration_notes="TUIC v4 使用 token 认证"
-                ),
-                "5": VersionInfo(
-                    protocol="tuic",
-                    version="5",
-                    features=["uuid", "password", "congestion_control", "udp_relay_mode", "reduce_rtt"],
-                    removed_features=["token", "disable_sni"],
-                    migration_notes="TUIC v5 改用 UUID+Password 认证模式"
-                )
-            },
-            "vless": {
-                "1": VersionInfo(
-                    protocol="vless",
-                    version="1",
-                    features=["uuid", "flow", "encryption", "transport", "tls", "xtls", "reality"],
-                    migration_notes="VLESS 是 VMess 的轻量级版本"
-                )
-            },
-            "wireguard": {
-                "1": VersionInfo(
-                    protocol="wireguard",
-                    version="1",
-                    features=["private_key", "public_key", "preshared_key", "allowed_ips", "endpoint"],
-                    migration_notes="WireGuard 是现代 VPN 协议"
-                )
-            }
-        }
-
-    def _initialize_compatibility_rules(self) -> Dict[str, List[CompatibilityRule]]:
-        """初始化兼容性规则"""
-        return {
-            "hysteria": [
-                CompatibilityRule(
-                    source_version="1",
-                    target_version="2",
-                    compatibility_level=CompatibilityLevel.PARTIAL,
-                    field_mappings={
-                        "auth_str": "auth",
-                        "obfs": "obfs",
-                        "up": "up_mbps",
-                        "down": "down_mbps"
-                    },
-                    warnings=["fast_open 和 lazy_start 功能在 v2 中不支持"]
-                ),
-                CompatibilityRule(
-                    source_version="2",
-                    target_version="1",
-                    compatibility_level=CompatibilityLevel.DEGRADED,
-                    field_mappings={
-                        "auth": "auth_str",
-                        "up_mbps": "up",
-                        "down_mbps": "down"
-                    },
-                    warnings=["brutal 和 salamander 混淆在 v1 中不支持"]
-                )
-            ],
-            "tuic": [
-                CompatibilityRule(
-                    source_version="4",
-                    target_version="5",
-                    compatibility_level=CompatibilityLevel.PARTIAL,
-                    field_mappings={
-                        "token": "uuid",  # token 映射到 uuid
-                        "disable_sni": None,  # 移除该字段
-                    },
-                    warnings=["需要同时设置 password 字段", "disable_sni 功能已移除"]
-                ),
-                CompatibilityRule(
-                    source_version="5",
-                    target_version="4",
-                    compatibility_level=CompatibilityLevel.DEGRADED,
-                    field_mappings={
-                        "uuid": "token",
-                        "password": None,  # v4 不支持独立密码
-                        "udp_relay_mode": None,
-                        "reduce_rtt": None
-                    },
-                    warnings=["password、udp_relay_mode、reduce_rtt 功能在 v4 中不支持"]
-                )
-            ]
-        }
-
-    def _initialize_field_mappings(self) -> Dict[str, Dict[str, str]]:
-        """初始化字段映射"""
-        return {
-            "clash_to_singbox": {
-                "server": "server",
-                "port": "server_port",
-                "cipher": "method",
-                "uuid": "uuid",
-                "alterId": "alter_id",
-                "skip-cert-verify": "tls.insecure",
-                "sni": "tls.server_name",
-                "network": "transport.type",
-                "ws-opts.path": "transport.path",
-                "ws-opts.headers.Host": "transport.headers.Host",
-                "h2-opts.path": "transport.path",
-                "h2-opts.host": "transport.host",
-                "grpc-opts.grpc-service-name": "transport.service_name"
-            },
-            "singbox_to_clash": {
-                "server": "server",
-                "server_port": "port",
-                "method": "cipher",
-                "uuid": "uuid",
-                "alter_id": "alterId",
-                "tls.insecure": "skip-cert-verify",
-                "tls.server_name": "sni",
-                "transport.type": "network",
-                "transport.path": "ws-opts.path",
-                "transport.headers.Host": "ws-opts.headers.Host",
-                "transport.host": "h2-opts.host",
-                "transport.service_name": "grpc-opts.grpc-service-name"
-            }
+        self.field_mappings = _FIELD_MAPPINGS
+        
+        # 为每种格式组合预先生成专用的迁移函数
+        self._migrate_fns: Dict[str, Callable[[Dict[str, Any]], Tuple[Dict[str, Any], List[str]]]] = {
+            mapping_key: self._build_migrate_fn(field_mapping)
+            for mapping_key, field_mapping in self.field_mappings.items()
+            if field_mapping
         }
+        
+        # 预先解析已知版本号
+        for versions in self.protocol_versions.values():
+            for ver in versions:
+                _parse_version(ver)
 
     def get_protocol_version(self, protocol: str, version: str) -> Optional[VersionInfo]:
         """获取协议版本信息"""
-        protocol_versions = self.protocol_versions.get(protocol.lower(), {})
+        protocol_versions = self.protocol_versions.get(_canon_protocol(protocol), {})
         return protocol_versions.get(version)
 
     def check_compatibility(self, 
@@ -209,46 +306,54 @@ class VersionManager:
                           source_version: str, 
                           target_version: str) -> CompatibilityRule:
         """检查版本兼容性"""
-        protocol_rules = self.compatibility_rules.get(protocol.lower(), [])
-        
-        for rule in protocol_rules:
-            if rule.source_version == source_version and rule.target_version == target_version:
-                return rule
+        rule = self._rule_index.get(_canon_protocol(protocol), {}).get((source_version, target_version))
+        if rule is not None:
+            return rule
         
         # 如果没有找到明确的规则，进行版本比较
-        try:
-            source_ver = pkg_version.parse(source_version)
-            target_ver = pkg_version.parse(target_version)
-            
-            if source_ver == target_ver:
-                return CompatibilityRule(
-                    source_version=source_version,
-                    target_version=target_version,
-                    compatibility_level=CompatibilityLevel.FULL
-                )
-            elif source_ver < target_ver:
-                # 从低版本到高版本，通常是部分兼容
-                return CompatibilityRule(
-                    source_version=source_version,
-                    target_version=target_version,
-                    compatibility_level=CompatibilityLevel.PARTIAL,
-                    warnings=[f"从 v{source_version} 升级到 v{target_version} 可能有功能变更"]
-                )
-            else:
-                # 从高版本到低版本，通常是降级兼容
-                return CompatibilityRule(
-                    source_version=source_version,
-                    target_version=target_version,
-                    compatibility_level=CompatibilityLevel.DEGRADED,
-                    warnings=[f"从 v{source_version} 降级到 v{target_version} 会丢失部分功能"]
-                )
-        except:
-            # 无法解析版本号，标记为不兼容
+        # 纯数字版本号直接比较编码后的整数
+        source_code = _encode_version(source_version)
+        target_code = _encode_version(target_version)
+        if source_code is not None and target_code is not None:
+            return self._rule_by_order(source_version, target_version, source_code, target_code)
+        
+        source_ver = _parse_version(source_version)
+        target_ver = _parse_version(target_version)
+        if source_ver is not None and target_ver is not None:
+            return self._rule_by_order(source_version, target_version, source_ver, target_ver)
+        
+        # 无法解析版本号，标记为不兼容
+        return CompatibilityRule(
+            source_version=source_version,
+            target_version=target_version,
+            compatibility_level=CompatibilityLevel.INCOMPATIBLE,
+            warnings=(f"无法确定 v{source_version} 和 v{target_version} 的兼容性",)
+        )
+
+    def _rule_by_order(self, source_version: str, target_version: str,
+                       source_key: Any, target_key: Any) -> CompatibilityRule:
+        """根据版本先后关系生成兼容性规则"""
+        if source_key == target_key:
+            return CompatibilityRule(
+                source_version=source_version,
+                target_version=target_version,
+                compatibility_level=CompatibilityLevel.FULL
+            )
+        elif source_key < target_key:
+            # 从低版本到高版本，通常是部分兼容
             return CompatibilityRule(
                 source_version=source_version,
                 target_version=target_version,
-                compatibility_level=CompatibilityLevel.INCOMPATIBLE,
-                warnings=[f"无法确定 v{source_version} 和 v{target_version} 的兼容性"]
+                compatibility_level=CompatibilityLevel.PARTIAL,
+                warnings=(f"从 v{source_version} 升级到 v{target_version} 可能有功能变更",)
+            )
+        else:
+            # 从高版本到低版本，通常是降级兼容
+            return CompatibilityRule(
+                source_version=source_version,
+                target_version=target_version,
+                compatibility_level=CompatibilityLevel.DEGRADED,
+                warnings=(f"从 v{source_version} 降级到 v{target_version} 会丢失部分功能",)
             )
 
     def migrate_config(self, 
@@ -257,33 +362,66 @@ class VersionManager:
                       target_format: str) -> tuple[Dict[str, Any], List[str]]:
         """迁移配置格式"""
         mapping_key = f"{source_format}_to_{target_format}"
-        field_mapping = self.field_mappings.get(mapping_key, {})
+        migrate_fn = self._migrate_fns.get(mapping_key)
         
-        if not field_mapping:
+        if migrate_fn is None:
             self.logger.warning(f"未找到 {source_format} 到 {target_format} 的映射规则")
             return config, [f"未找到格式映射规则: {source_format} -> {target_format}"]
         
-        migrated_config = {}
-        warnings = []
-        
+        return migrate_fn(config)
+
+    def _build_migrate_fn(self, field_mapping: Mapping[str, Optional[str]]):
+        """根据字段映射生成迁移函数
+
+        映射中的路径在此一次性拆分，单层字段直接读写字典，只有嵌套路径才逐级访问
+        """
+        # (源字段, 源路径, 目标字段, 目标路径)，路径为 None 表示单层字段
+        steps = []
         for source_field, target_field in field_mapping.items():
-            if target_field is None:
-                # 字段已被移除
-                if source_field in config:
-                    warnings.append(f"字段 '{source_field}' 在目标格式中不支持，已忽略")
-                continue
+            source_keys = tuple(source_field.split('.'))
+            target_keys = tuple(target_field.split('.')) if target_field is not None else None
+            steps.append((
+                source_field,
+                source_keys if len(source_keys) > 1 else None,
+                target_field,
+                target_keys if target_keys is not None and len(target_keys) > 1 else None
+            ))
+        steps = tuple(steps)
+        mapped_fields = frozenset(field_mapping)
+        get_nested = self._get_nested_value
+        set_nested = self._set_nested_value
+
+        def migrate(config: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+            migrated_config = {}
+            warnings = []
             
-            # 处理嵌套字段
-            source_value = self._get_nested_value(config, source_field)
-            if source_value is not None:
-                self._set_nested_value(migrated_config, target_field, source_value)
-        
-        # 复制未映射的字段
-        for key, value in config.items():
-            if key not in field_mapping and key not in migrated_config:
-                migrated_config[key] = value
-        
-        return migrated_config, warnings
+            for source_field, source_keys, target_field, target_keys in steps:
+                if target_field is None:
+                    # 字段已被移除
+                    if source_field in config:
+                        warnings.append(f"字段 '{source_field}' 在目标格式中不支持，已忽略")
+                    continue
+                
+                if source_keys is None:
+                    source_value = config.get(source_field)
+                else:
+                    source_value = get_nested(config, source_keys)
+                if source_value is None:
+                    continue
+                
+                if target_keys is None:
+                    migrated_config[target_field] = source_value
+                else:
+                    set_nested(migrated_config, target_keys, source_value)
+            
+            # 复制未映射的字段
+            for key, value in config.items():
+                if key not in mapped_fields and key not in migrated_config:
+                    migrated_config[key] = value
+            
+            return migrated_config, warnings
+
+        return migrate
 
     def migrate_node_version(self, 
                            node: ProxyNode,
@@ -293,7 +431,7 @@ class VersionManager:
             return node, []
         
         current_version = node.extra_config.get('version', '1')
-        protocol = node.type.lower() if hasattr(node.type, 'lower') else str(node.type).lower()
+        protocol = _canon_protocol(node.type if isinstance(node.type, str) else str(node.type))
         
         # 检查兼容性
         compatibility = self.check_compatibility(protocol, current_version, target_version)
@@ -302,18 +440,19 @@ class VersionManager:
             return node, [f"无法将 {protocol} v{current_version} 迁移到 v{target_version}"]
         
         # 应用字段映射
-        warnings = compatibility.warnings or []
+        warnings = list(compatibility.warnings or ())
         migrated_node = self._apply_node_migration(node, compatibility)
         
         # 更新版本信息
         if hasattr(migrated_node, 'extra_config'):
-            migrated_node.extra_config['version'] = target_version
+            # 浅拷贝的节点与原节点共享 extra_config，替换而不是原地修改
+            migrated_node.extra_config = {**migrated_node.extra_config, 'version': target_version}
         
         return migrated_node, warnings
 
-    def _get_nested_value(self, data: Dict[str, Any], path: str) -> Any:
-        """获取嵌套字段值"""
-        keys = path.split('.')
+    def _get_nested_value(self, data: Dict[str, Any], path: Union[str, Tuple[str, ...]]) -> Any:
+        """获取嵌套字段值，path 可为点分路径或预先拆分的键元组"""
+        keys = path.split('.') if isinstance(path, str) else path
         current = data
         
         for key in keys:
@@ -324,9 +463,9 @@ class VersionManager:
         
         return current
 
-    def _set_nested_value(self, data: Dict[str, Any], path: str, value: Any):
-        """设置嵌套字段值"""
-        keys = path.split('.')
+    def _set_nested_value(self, data: Dict[str, Any], path: Union[str, Tuple[str, ...]], value: Any):
+        """设置嵌套字段值，path 可为点分路径或预先拆分的键元组"""
+        keys = path.split('.') if isinstance(path, str) else path
         current = data
         
         for key in keys[:-1]:
@@ -341,22 +480,22 @@ class VersionManager:
         if not rule.field_mappings:
             return node
         
-        # 创建节点副本
-        migrated_node = ProxyNode(**node.dict())
-        
-        # 应用字段映射
+        # 收集需要变更的字段
+        node_values = node.__dict__
+        updates = {}
         for source_field, target_field in rule.field_mappings.items():
-            if target_field is None:
-                # 移除字段
-                if hasattr(migrated_node, source_field):
-                    delattr(migrated_node, source_field)
+            if source_field not in _PROXY_NODE_FIELDS:
                 continue
             
-            # 映射字段
-            if hasattr(node, source_field):
-                source_value = getattr(node, source_field)
-                if hasattr(migrated_node, target_field):
-                    setattr(migrated_node, target_field, source_value)
+            if target_field is None:
+                # 移除字段
+                updates[source_field] = None
+            elif target_field in _PROXY_NODE_FIELDS:
+                # 映射字段
+                updates[target_field] = node_values[source_field]
+        
+        # 浅拷贝节点并应用变更，无需重新校验整个模型
+        migrated_node = node.model_copy(update=updates)
         
         # 应用转换函数
         if rule.transformation_func:
@@ -369,8 +508,8 @@ class VersionManager:
 
     def get_supported_versions(self, protocol: str) -> List[str]:
         """获取协议支持的版本列表"""
-        protocol_versions = self.protocol_versions.get(protocol.lower(), {})
-        return sorted(protocol_versions.keys(), key=lambda x: pkg_version.parse(x) if x.replace('.', '').isdigit() else x)
+        protocol_versions = self.protocol_versions.get(_canon_protocol(protocol), {})
+        return sorted(protocol_versions.keys(), key=lambda x: _parse_version(x) if x.replace('.', '').isdigit() else x)
 
     def get_latest_version(self, protocol: str) -> Optional[str]:
         """获取协议的最新版本"""
@@ -378,13 +517,12 @@ class VersionManager:
         if not versions:
             return None
         
-        try:
-            # 尝试按版本号排序
-            sorted_versions = sorted(versions, key=pkg_version.parse, reverse=True)
-            return sorted_versions[0]
-        except:
+        # 尝试按版本号取最大值
+        parsed = [_parse_version(ver) for ver in versions]
+        if None in parsed:
             # 如果无法解析版本号，返回最后一个
             return versions[-1]
+        return max(zip(parsed, versions))[1]
 
     def recommend_migration_path(self, 
                                 protocol: str,
@@ -394,30 +532,23 @@ class VersionManager:
         if current_version == target_version:
             return [current_version]
         
-        try:
-            current_ver = pkg_version.parse(current_version)
-            target_ver = pkg_version.parse(target_version)
-            
-            # 获取所有支持的版本
-            all_versions = self.get_supported_versions(protocol)
-            
-            if current_ver < target_ver:
-                # 升级路径：逐步升级
-                path = [current_version]
-                for ver_str in all_versions:
-                    try:
-                        ver = pkg_version.parse(ver_str)
-                        if current_ver < ver <= target_ver:
-                            path.append(ver_str)
-                    except:
-                        continue
-                return path
-            else:
-                # 降级路径：直接降级
-                return [current_version, target_version]
-        except:
+        current_ver = _parse_version(current_version)
+        target_ver = _parse_version(target_version)
+        if current_ver is None or target_ver is None:
             # 无法解析版本号，直接迁移
             return [current_version, target_version]
+        
+        if current_ver < target_ver:
+            # 升级路径：逐步升级
+            path = [current_version]
+            for ver_str in self.get_supported_versions(protocol):
+                ver = _parse_version(ver_str)
+                if ver is not None and current_ver < ver <= target_ver:
+                    path.append(ver_str)
+            return path
+        
+        # 降级路径：直接降级
+        return [current_version, target_version]
 
     def validate_config_compatibility(self, 
                                     config: Dict[str, Any],
@@ -433,53 +564,42 @@ class VersionManager:
             warnings.append(f"未知的协议版本: {protocol} v{version}")
             return warnings
         
+        # 一次性收集配置中所有有值的字段路径，之后的检查都是集合查找
+        present = self._flat_keys(config)
+        
         # 检查必需字段
         required_fields = self._get_required_fields(protocol, version, format_type)
-        for field in required_fields:
-            if not self._get_nested_value(config, field):
-                warnings.append(f"缺少必需字段: {field}")
+        warnings.extend(f"缺少必需字段: {field}" for field in required_fields if field not in present)
         
         # 检查已弃用字段
         if version_info.deprecated_features:
-            for field in version_info.deprecated_features:
-                if self._get_nested_value(config, field):
-                    warnings.append(f"字段 '{field}' 已弃用，建议移除")
+            warnings.extend(f"字段 '{field}' 已弃用，建议移除"
+                            for field in version_info.deprecated_features if field in present)
         
         # 检查已移除字段
         if version_info.removed_features:
-            for field in version_info.removed_features:
-                if self._get_nested_value(config, field):
-                    warnings.append(f"字段 '{field}' 在此版本中不再支持")
+            warnings.extend(f"字段 '{field}' 在此版本中不再支持"
+                            for field in version_info.removed_features if field in present)
         
         return warnings
 
-    def _get_required_fields(self, protocol: str, version: str, format_type: str) -> List[str]:
-        """获取必需字段列表"""
-        # 基础必需字段
-        base_fields = ["name", "server", "port"]
-        
-        # 协议特定字段
-        protocol_fields = {
-            "hysteria": ["auth", "up_mbps", "down_mbps"],
-            "hysteria2": ["auth", "up_mbps", "down_mbps"],
-            "tuic": ["uuid", "password"] if version == "5" else ["token"],
-            "vless": ["uuid"],
-            "vmess": ["uuid"],
-            "trojan": ["password"],
-            "ss": ["method", "password"],
-            "ssr": ["method", "password", "protocol", "obfs"],
-            "wireguard": ["private_key", "peer_public_key"]
-        }
-        
-        fields = base_fields + protocol_fields.get(protocol, [])
-        
-        # 根据格式调整字段名
-        if format_type == "sing-box":
-            # sing-box 使用不同的字段名
-            field_mapping = self.field_mappings.get("clash_to_singbox", {})
-            fields = [field_mapping.get(field, field) for field in fields]
-        
-        return fields
+    def _flat_keys(self, data: Dict[str, Any], prefix: str = "", out: Optional[set] = None) -> set:
+        """收集配置中值为真的字段的点分路径（包括嵌套字段）"""
+        if out is None:
+            out = set()
+        for key, value in data.items():
+            if not isinstance(key, str):
+                continue
+            path = prefix + key
+            if value:
+                out.add(path)
+            if isinstance(value, dict):
+                self._flat_keys(value, path + '.', out)
+        return out
+
+    def _get_required_fields(self, protocol: str, version: str, format_type: str) -> Tuple[str, ...]:
+        """获取必需字段列表（按 协议/版本/格式 缓存）"""
+        return _required_fields(protocol, version, format_type)
 
 
 # 全局版本管理器实例
@@ -4,20 +4,169 @@
 
 import yaml
 import json
+import asyncio
+import itertools
+import re
+import time
 import httpx
 import logging
-from typing import List, Dict, Any, Optional, Union
+import urllib.request
+from typing import IO, Callable, List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime
+from types import MappingProxyType
 
 from .parser import SubscriptionParser
 from .rules import RuleProcessor
+from .performance.dns_cache import CachingDNSBackend, CachingDNSTransport
 from ..models.schemas import (
     ConversionRequest, ProxyNode, ProxyGroup, 
-    ClashConfig, ConversionResponse, TargetFormat
+    ClashConfig, ConversionResponse
 )
 
+try:
+    import h2  # noqa: F401  httpx 的 HTTP/2 支持依赖 h2
+    _HTTP2_ENABLED = True
+except ImportError:  # h2 为可选依赖
+    _HTTP2_ENABLED = False
+
 logger = logging.getLogger(__name__)
 
+# 订阅拉取使用的默认请求头；Accept-Encoding 由 httpx 按已安装的解码器
+# 自动协商（gzip/deflate，安装 brotli、zstandard 后追加 br、zstd）
+_FETCH_HEADERS = {'User-Agent': 'clash-meta/1.15.0'}
+
+# 订阅解析结果缓存时间（秒）与最大条目数
+_SUB_CACHE_TTL = 300
+_SUB_CACHE_MAXSIZE = 256
+
+# 订阅域名解析结果缓存时间（秒）
+_DNS_CACHE_TTL = 300
+
+# Clash 代理必须包含的字段
+_REQUIRED_PROXY_FIELDS = ('name', 'type', 'server', 'port')
+
+# 远程规则配置变化较少，缓存时间更长
+_REMOTE_CONFIG_CACHE_TTL = 600
+
+# 使用 SafeDumper 输出配置，跳过默认 Dumper 对任意 Python 对象的表示器查找；
+# libyaml 的 CSafeDumper 会把国旗等非 BMP 字符转义为 \U 序列，节点名称不可读，因此不使用
+_YAML_DUMPER = yaml.SafeDumper
+
+# 每次生成配置时共享的静态基础配置（只读，嵌套结构不应被修改）
+_BASE_CLASH_CONFIG = MappingProxyType({
+    'port': 7890,
+    'socks-port': 7891,
+    'allow-lan': False,
+    'mode': 'rule',
+    'log-level': 'info',
+    'external-controller': '127.0.0.1:9090',
+    'dns': {
+        'enable': True,
+        'listen': '0.0.0.0:53',
+        'default-nameserver': ['223.5.5.5', '119.29.29.29'],
+        'enhanced-mode': 'fake-ip',
+        'fake-ip-range': '198.18.0.1/16',
+        'fake-ip-filter': [
+            '*.lan',
+            '*.localdomain',
+            '*.example',
+            '*.invalid',
+            '*.localhost',
+            '*.test',
+            '*.local',
+            '*.home.arpa'
+        ],
+        'nameserver': ['https://doh.pub/dns-query', 'https://dns.alidns.com/dns-query']
+    }
+})
+
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+def _parse_template_overrides(template: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """将远程模板中的全局配置转换为适当的类型"""
+    overrides = {}
+    if not template:
+        return overrides
+    
+    for key, value in template.items():
+        if key == 'clash_rule_base':
+            continue
+        try:
+            lowered = value.lower()
+            if lowered == 'true':
+                overrides[key] = True
+            elif lowered == 'false':
+                overrides[key] = False
+            elif value.isdigit():
+                overrides[key] = int(value)
+            else:
+                overrides[key] = value
+        except AttributeError:
+            overrides[key] = value
+    return overrides
+
+
+class _AsyncTTLCache:
+    """带过期时间与按键单飞锁的进程内缓存"""
+    
+    def __init__(self, ttl: float, maxsize: int = 256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: Dict[str, tuple] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+    
+    def get(self, key: str) -> Any:
+        """获取未过期的缓存值，不存在或已过期返回 None"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            self._data.pop(key, None)
+            return None
+        return value
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """写入缓存，超出容量时先清理过期项再淘汰最早写入的条目"""
+        now = time.monotonic()
+        self._data.pop(key, None)
+        if len(self._data) >= self.maxsize:
+            for k in [k for k, (exp, _) in self._data.items() if exp <= now]:
+                del self._data[k]
+            while len(self._data) >= self.maxsize:
+                del self._data[next(iter(self._data))]
+        self._data[key] = (now + (self.ttl if ttl is None else ttl), value)
+    
+    def lock(self, key: str) -> asyncio.Lock:
+        """获取按键的单飞锁，避免并发未命中时重复请求源站"""
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+    
+    def release_lock(self, key: str):
+        """在缓存填充完成后移除单飞锁"""
+        self._locks.pop(key, None)
+    
+    def clear(self):
+        """清空缓存"""
+        self._data.clear()
+
+
+def _cache_ttl_from_headers(headers: httpx.Headers, default: float) -> float:
+    """根据上游 Cache-Control 缩短缓存时间，no-store/no-cache 时不缓存"""
+    cache_control = headers.get('cache-control')
+    if not cache_control:
+        return default
+    cache_control = cache_control.lower()
+    if 'no-store' in cache_control or 'no-cache' in cache_control:
+        return 0
+    match = _MAX_AGE_RE.search(cache_control)
+    if match:
+        return min(default, int(match.group(1)))
+    return default
+
 
 class SubscriptionConverter:
     """订阅转换器"""
@@ -25,6 +174,46 @@ class SubscriptionConverter:
     def __init__(self):
         self.parser = SubscriptionParser()
         self.rule_processor = RuleProcessor()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._dns_backend = CachingDNSBackend(ttl=_DNS_CACHE_TTL)
+        self._sub_cache = _AsyncTTLCache(_SUB_CACHE_TTL, _SUB_CACHE_MAXSIZE)
+        self._rconfig_cache = _AsyncTTLCache(_REMOTE_CONFIG_CACHE_TTL)
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """获取（必要时创建）共享的 HTTP 客户端，复用连接池与 keep-alive"""
+        if self._client is None or self._client.is_closed:
+            limits = httpx.Limits(
+                max_connections=1000,
+                max_keepalive_connections=100,
+                keepalive_expiry=30
+            )
+            if urllib.request.getproxies():
+                # 配置了环境变量代理时由代理解析域名，使用 httpx 默认传输层以保留代理设置
+                self._client = httpx.AsyncClient(
+                    timeout=30.0,
+                    headers=_FETCH_HEADERS,
+                    follow_redirects=True,
+                    http2=_HTTP2_ENABLED,
+                    limits=limits
+                )
+            else:
+                self._client = httpx.AsyncClient(
+                    timeout=30.0,
+                    headers=_FETCH_HEADERS,
+                    follow_redirects=True,
+                    transport=CachingDNSTransport(
+                        http2=_HTTP2_ENABLED,
+                        limits=limits,
+                        dns_backend=self._dns_backend
+                    )
+                )
+        return self._client
+    
+    async def aclose(self):
+        """关闭共享的 HTTP 客户端，在应用关闭时调用"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     async def convert_subscription(self, request: ConversionRequest) -> ConversionResponse:
         """
@@ -37,11 +226,23 @@ class SubscriptionConverter:
             转换响应
         """
         try:
-            # 1. 获取并解析订阅内容
+            # 1. 并发获取并解析订阅内容，单个链接失败不影响其他链接
+            results = await asyncio.gather(
+                *(self._fetch_and_parse_subscription(url) for url in request.url),
+                return_exceptions=True
+            )
             all_nodes = []
-            for url in request.url:
-                nodes = await self._fetch_and_parse_subscription(url)
-                all_nodes.extend(nodes)
+            errors = []
+            for url, nodes in zip(request.url, results):
+                if isinstance(nodes, BaseException):
+                    logger.error("Failed to fetch subscription from %s: %s", url, nodes)
+                    errors.append(nodes)
+                else:
+                    all_nodes.extend(nodes)
+            
+            # 所有链接均异常时向上抛出，由统一的错误处理返回失败原因
+            if errors and len(errors) == len(results):
+                raise errors[0]
             
             if not all_nodes:
                 return ConversionResponse(
@@ -50,48 +251,47 @@ class SubscriptionConverter:
                     nodes_count=0
                 )
             
-            logger.info(f"Parsed {len(all_nodes)} nodes from subscriptions")
+            logger.info("Parsed %d nodes from subscriptions", len(all_nodes))
             
-            # 2. 应用节点过滤
-            filtered_nodes = self._apply_node_filters(all_nodes, request)
+            # 2. 计算过滤后保留的节点名称
+            allowed_names = self._filter_node_names(all_nodes, request)
             
-            if not filtered_nodes:
+            if allowed_names is not None and not allowed_names:
                 return ConversionResponse(
                     success=False,
                     message="节点过滤后没有剩余节点",
                     nodes_count=0
                 )
             
-            logger.info(f"After filtering: {len(filtered_nodes)} nodes remaining")
+            # 3. 单次遍历完成过滤、Emoji 与 Clash 格式转换
+            clash_proxies, node_names, nodes_count = self._build_clash_proxies(
+                all_nodes, request, allowed_names
+            )
             
-            # 3. 应用节点重命名
-            renamed_nodes = self._apply_node_rename(filtered_nodes, request)
+            logger.info("After filtering: %d nodes remaining", nodes_count)
             
             # 4. 获取远程规则配置
-            remote_config = None
+            remote_config = template_overrides = None
             if request.remote_config:
-                remote_config = await self.rule_processor.fetch_remote_config(str(request.remote_config))
-            
-            # 5. 根据目标格式生成配置
-            if request.target == TargetFormat.CLASH:
-                config = await self._generate_clash_config(
-                    renamed_nodes, request, remote_config
-                )
-            else:
-                # 其他格式暂时不支持，返回 Clash 格式
-                config = await self._generate_clash_config(
-                    renamed_nodes, request, remote_config
+                remote_config, template_overrides = await self._get_remote_config(
+                    str(request.remote_config)
                 )
             
+            # 5. 生成配置（其他目标格式暂时不支持，统一返回 Clash 格式）
+            config = await self._generate_clash_config(
+                clash_proxies, node_names, request, remote_config,
+                template_overrides=template_overrides
+            )
+            
             return ConversionResponse(
                 success=True,
                 message="转换成功",
                 config=config,
-                nodes_count=len(renamed_nodes)
+                nodes_count=nodes_count
             )
             
         except Exception as e:
-            logger.error(f"Conversion failed: {e}")
+            logger.error("Conversion failed: %s", e)
             return ConversionResponse(
                 success=False,
                 message=f"转换失败: {str(e)}",
@@ -99,89 +299,146 @@ class SubscriptionConverter:
             )
     
     async def _fetch_and_parse_subscription(self, url: str) -> List[ProxyNode]:
-        """获取并解析订阅"""
-        try:
-            async with httpx.AsyncClient(
-                timeout=30.0,
-                headers={'User-Agent': 'clash-meta/1.15.0'},
-                follow_redirects=True
-            ) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                
-                content = response.text
-                nodes = self.parser.parse_subscription(content)
-                
-                logger.info(f"Fetched subscription from {url}, got {len(nodes)} nodes")
-                return nodes
-                
-        except Exception as e:
-            logger.error(f"Failed to fetch subscription from {url}: {e}")
-            return []
+        """获取并解析订阅，解析结果按链接缓存"""
+        nodes = self._sub_cache.get(url)
+        if nodes is None:
+            async with self._sub_cache.lock(url):
+                nodes = self._sub_cache.get(url)
+                if nodes is None:
+                    try:
+                        nodes = await self._download_subscription(url)
+                    finally:
+                        self._sub_cache.release_lock(url)
+        else:
+            logger.debug("Subscription cache hit for %s", url)
+        
+        # 返回副本，后续重命名等操作不会污染缓存中的节点
+        return [node.model_copy() for node in nodes]
     
-    def _apply_node_filters(self, nodes: List[ProxyNode], request: ConversionRequest) -> List[ProxyNode]:
-        """应用节点过滤"""
-        filtered_nodes = nodes[:]
+    async def _download_subscription(self, url: str) -> List[ProxyNode]:
+        """下载并解析订阅，成功时写入缓存；下载或解析异常直接抛出，由调用方按链接处理"""
+        response = await self._get_client().get(url)
+        response.raise_for_status()
         
-        # 提取节点名称用于过滤
-        node_names = [node.name for node in nodes]
+        # 直接使用响应字节，跳过 response.text 的字符集探测与整体解码
+        content = response.content
+        # 解码与解析属于 CPU 密集操作，放到工作线程执行，避免阻塞事件循环
+        nodes = await asyncio.to_thread(self.parser.parse_subscription, content)
+        
+        logger.info("Fetched subscription from %s, got %d nodes", url, len(nodes))
+        
+        ttl = _cache_ttl_from_headers(response.headers, self._sub_cache.ttl)
+        if nodes and ttl > 0:
+            self._sub_cache.set(url, nodes, ttl)
+        return nodes
+    
+    async def _get_remote_config(self, url: str) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        获取远程规则配置，结果按链接缓存
+        
+        Returns:
+            (远程配置, 已完成类型转换的模板全局配置)，获取失败时均为 None
+        """
+        entry = self._rconfig_cache.get(url)
+        if entry is not None:
+            return entry
+        
+        async with self._rconfig_cache.lock(url):
+            entry = self._rconfig_cache.get(url)
+            if entry is None:
+                try:
+                    remote_config = await self.rule_processor.fetch_remote_config(url)
+                finally:
+                    self._rconfig_cache.release_lock(url)
+                if remote_config is None:
+                    return None, None
+                entry = (remote_config, _parse_template_overrides(remote_config.get('template')))
+                self._rconfig_cache.set(url, entry)
+        return entry
+    
+    def _filter_node_names(self, nodes: List[ProxyNode], request: ConversionRequest) -> Optional[set]:
+        """计算过滤后保留的节点名称集合，未设置过滤规则时返回 None 表示全部保留"""
+        if not request.include and not request.exclude:
+            return None
+        
+        # 提取节点名称用于过滤（正则在 RuleProcessor 中按模式缓存编译结果）
+        node_names = tuple(node.name for node in nodes)
         
         # 应用过滤规则
-        filtered_names = self.rule_processor.apply_node_filters(
+        return set(self.rule_processor.apply_node_filters(
             node_names, 
             request.include, 
             request.exclude
-        )
+        ))
+    
+    def _build_clash_proxies(self,
+                             nodes: List[ProxyNode],
+                             request: ConversionRequest,
+                             allowed_names: Optional[set]) -> tuple[List[Dict[str, Any]], List[str], int]:
+        """
+        单次遍历：跳过被过滤的节点，添加 Emoji 并转换为 Clash 格式
         
-        # 根据过滤后的名称筛选节点
-        filtered_nodes = [node for node in nodes if node.name in filtered_names]
+        Returns:
+            (Clash 代理列表, 代理名称列表, 过滤后保留的节点数)
+        """
+        add_emoji_flags = self.rule_processor.add_emoji_flags if request.emoji else None
+        # 计数器同时提供保留节点的序号（用于日志）和过滤后的节点总数
+        counter = itertools.count()
+        pairs = [
+            (clash_proxy, node.name)
+            for node in nodes
+            if (allowed_names is None or node.name in allowed_names)
+            and (clash_proxy := self._prepare_clash_proxy(next(counter), node, request, add_emoji_flags))
+        ]
+        nodes_count = next(counter)
+        if not pairs:
+            return [], [], nodes_count
         
-        return filtered_nodes
+        clash_proxies, node_names = zip(*pairs)
+        return list(clash_proxies), list(node_names), nodes_count
     
-    def _apply_node_rename(self, nodes: List[ProxyNode], request: ConversionRequest) -> List[ProxyNode]:
-        """应用节点重命名"""
+    def _prepare_clash_proxy(self,
+                             i: int,
+                             node: ProxyNode,
+                             request: ConversionRequest,
+                             add_emoji_flags: Optional[Callable[[str], str]]) -> Optional[Dict[str, Any]]:
+        """为单个节点添加 Emoji 并转换为 Clash 格式，缺少必需字段时返回 None"""
         # 不再应用重命名规则，只添加 Emoji（如果启用）
-        for node in nodes:
-            new_name = node.name
+        if add_emoji_flags is not None:
+            node.name = add_emoji_flags(node.name)
+        
+        try:
+            clash_proxy = self._convert_node_to_clash(node, request)
+            if not clash_proxy:
+                logger.warning("Failed to convert node %d: %s (%s)", i, node.name, node.type)
+                return None
             
-            # 添加 Emoji（如果启用）
-            if request.emoji:
-                new_name = self.rule_processor.add_emoji_flags(new_name)
+            # 验证必需字段
+            missing_fields = [field for field in _REQUIRED_PROXY_FIELDS if not clash_proxy.get(field)]
+            if missing_fields:
+                logger.warning("Node %d (%s) missing required fields: %s", i, node.name, missing_fields)
+                return None
             
-            node.name = new_name
-        
-        return nodes
+            logger.debug("Successfully converted node %d: %s (%s)", i, node.name, node.type)
+            return clash_proxy
+        except Exception as e:
+            logger.error("Error converting node %d (%s): %s", i, node.name, e)
+            return None
     
     async def _generate_clash_config(self, 
-                                   nodes: List[ProxyNode], 
+                                   clash_proxies: List[Dict[str, Any]], 
+                                   node_names: List[str],
                                    request: ConversionRequest,
-                                   remote_config: Optional[Dict[str, Any]] = None) -> str:
-        """生成 Clash 配置"""
+                                   remote_config: Optional[Dict[str, Any]] = None,
+                                   out_stream: Optional[IO[str]] = None,
+                                   template_overrides: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        根据已转换的代理生成 Clash 配置
+        
+        传入 out_stream 时直接将 YAML 写入该流并返回 None，避免额外构建完整字符串；
+        template_overrides 为缓存的模板全局配置，未传入时从 remote_config 中解析
+        """
         try:
-            # 转换节点为 Clash 格式
-            clash_proxies = []
-            node_names = []
-            
-            for i, node in enumerate(nodes):
-                try:
-                    clash_proxy = self._convert_node_to_clash(node, request)
-                    if clash_proxy:
-                        # 验证必需字段
-                        required_fields = ['name', 'type', 'server', 'port']
-                        missing_fields = [field for field in required_fields if field not in clash_proxy or not clash_proxy[field]]
-                        
-                        if missing_fields:
-                            logger.warning(f"Node {i} ({node.name}) missing required fields: {missing_fields}")
-                            continue
-                            
-                        clash_proxies.append(clash_proxy)
-                        node_names.append(node.name)
-                        logger.debug(f"Successfully converted node {i}: {node.name} ({node.type})")
-                    else:
-                        logger.warning(f"Failed to convert node {i}: {node.name} ({node.type})")
-                except Exception as e:
-                    logger.error(f"Error converting node {i} ({node.name}): {e}")
-            
             # 生成代理组
             custom_groups = remote_config.get('custom_proxy_group', []) if remote_config else None
             proxy_groups = self.rule_processor.generate_proxy_groups(node_names, custom_groups)
@@ -205,34 +462,11 @@ class SubscriptionConverter:
                 logger.warning("No rules generated, using default rules")
                 rules = self.rule_processor.default_rules
             
-            logger.info(f"Generated config: {len(clash_proxies)} proxies, {len(proxy_groups)} groups, {len(rules)} rules")
+            logger.info("Generated config: %d proxies, %d groups, %d rules", len(clash_proxies), len(proxy_groups), len(rules))
             
             # 构建完整配置
             clash_config = {
-                'port': 7890,
-                'socks-port': 7891,
-                'allow-lan': False,
-                'mode': 'rule',
-                'log-level': 'info',
-                'external-controller': '127.0.0.1:9090',
-                'dns': {
-                    'enable': True,
-                    'listen': '0.0.0.0:53',
-                    'default-nameserver': ['223.5.5.5', '119.29.29.29'],
-                    'enhanced-mode': 'fake-ip',
-                    'fake-ip-range': '198.18.0.1/16',
-                    'fake-ip-filter': [
-                        '*.lan',
-                        '*.localdomain',
-                        '*.example',
-                        '*.invalid',
-                        '*.localhost',
-                        '*.test',
-                        '*.local',
-                        '*.home.arpa'
-                    ],
-                    'nameserver': ['https://doh.pub/dns-query', 'https://dns.alidns.com/dns-query']
-                },
+                **_BASE_CLASH_CONFIG,
                 'proxies': clash_proxies,
                 'proxy-groups': proxy_groups,
                 'rules': rules
@@ -242,30 +476,21 @@ class SubscriptionConverter:
             if rule_providers:
                 clash_config['rule-providers'] = rule_providers
             
-            # 添加模板配置
-            if remote_config and 'template' in remote_config:
-                template = remote_config['template']
-                
-                # 应用模板中的全局配置
-                for key, value in template.items():
-                    if key not in clash_config and key not in ['clash_rule_base']:
-                        try:
-                            # 尝试解析为适当的类型
-                            if value.lower() == 'true':
-                                clash_config[key] = True
-                            elif value.lower() == 'false':
-                                clash_config[key] = False
-                            elif value.isdigit():
-                                clash_config[key] = int(value)
-                            else:
-                                clash_config[key] = value
-                        except:
-                            clash_config[key] = value
-            
-            return yaml.dump(clash_config, default_flow_style=False, allow_unicode=True, sort_keys=False)
+            # 添加模板配置（基础配置优先，模板只补充缺失的全局配置）
+            if template_overrides is None and remote_config:
+                template_overrides = _parse_template_overrides(remote_config.get('template'))
+            if template_overrides:
+                for key, value in template_overrides.items():
+                    clash_config.setdefault(key, value)
+            
+            # 大型配置的序列化耗时较长，在工作线程中执行
+            return await asyncio.to_thread(
+                yaml.dump, clash_config, out_stream, Dumper=_YAML_DUMPER,
+                default_flow_style=False, allow_unicode=True, sort_keys=False
+            )
             
         except Exception as e:
-            logger.error(f"Failed to generate Clash config: {e}")
+            logger.error("Failed to generate Clash config: %s", e)
             raise
     
     def _convert_node_to_clash(self, node: ProxyNode, request: ConversionRequest) -> Optional[Dict[str, Any]]:
@@ -273,7 +498,7 @@ class SubscriptionConverter:
         try:
             # 验证节点基本信息
             if not node.name or not node.type or not node.server or not node.port:
-                logger.warning(f"Node has missing basic info: name={node.name}, type={node.type}, server={node.server}, port={node.port}")
+                logger.warning("Node has missing basic info: name=%s, type=%s, server=%s, port=%s", node.name, node.type, node.server, node.port)
                 return None
                 
             base_config = {
@@ -283,134 +508,12 @@ class SubscriptionConverter:
                 'port': int(node.port),
             }
             
-            # 根据协议类型添加特定配置
-            if node.type == 'ss':
-                base_config.update({
-                    'cipher': node.cipher,
-                    'password': node.password,
-                    'udp': request.udp and node.udp,
-                })
-            
-            elif node.type == 'ssr':
-                base_config.update({
-                    'cipher': node.cipher,
-                    'password': node.password,
-                    'protocol': node.protocol,
-                    'protocol-param': node.protocol_param,
-                    'obfs': node.obfs,
-                    'obfs-param': node.obfs_param,
-                    'udp': request.udp and node.udp,
-                })
-            
-            elif node.type == 'vmess':
-                base_config.update({
-                    'uuid': node.uuid,
-                    'alterId': node.alterId or 0,
-                    'cipher': node.cipher or 'auto',
-                    'udp': request.udp and node.udp,
-                })
-                
-                # 传输层配置
-                if node.network and node.network != 'tcp':
-                    base_config['network'] = node.network
-                    
-                    if node.network == 'ws':
-                        ws_opts = {}
-                        if node.path:
-                            ws_opts['path'] = node.path
-                        if node.host:
-                            ws_opts['headers'] = {'Host': node.host}
-                        if ws_opts:
-                            base_config['ws-opts'] = ws_opts
-                    
-                    elif node.network == 'h2':
-                        h2_opts = {}
-                        if node.path:
-                            h2_opts['path'] = node.path
-                        if node.host:
-                            h2_opts['host'] = [node.host]
-                        if h2_opts:
-                            base_config['h2-opts'] = h2_opts
-                    
-                    elif node.network == 'grpc':
-                        if node.path:
-                            base_config['grpc-opts'] = {
-                                'grpc-service-name': node.path
-                            }
-                
-                # TLS 配置
-                if node.tls:
-                    base_config['tls'] = True
-                    tls_opts = {}
-                    
-                    if node.sni:
-                        tls_opts['sni'] = node.sni
-                    
-                    if request.scv or node.skip_cert_verify:
-                        tls_opts['skip-cert-verify'] = True
-                    
-                    if tls_opts:
-                        base_config['tls-opts'] = tls_opts
-            
-            elif node.type == 'vless':
-                base_config.update({
-                    'uuid': node.uuid,
-                    'udp': request.udp and node.udp,
-                })
-                
-                # 传输层和 TLS 配置（类似 vmess）
-                if node.network and node.network != 'tcp':
-                    base_config['network'] = node.network
-                    # ... (类似 vmess 的传输层配置逻辑)
-                
-                if node.tls:
-                    base_config['tls'] = True
-                    # ... (类似 vmess 的 TLS 配置逻辑)
-            
-            elif node.type == 'trojan':
-                base_config.update({
-                    'password': node.password,
-                    'udp': request.udp and node.udp,
-                })
-                
-                if node.sni:
-                    base_config['sni'] = node.sni
-                
-                if request.scv or node.skip_cert_verify:
-                    base_config['skip-cert-verify'] = True
-            
-            elif node.type in ['hysteria', 'hysteria2']:
-                base_config.update({
-                    'udp': True,  # Hysteria 基于 UDP
-                })
-                
-                if node.auth_str:
-                    base_config['auth-str'] = node.auth_str
-                
-                if node.up:
-                    base_config['up'] = node.up
-                
-                if node.down:
-                    base_config['down'] = node.down
-                
-                if node.sni:
-                    base_config['sni'] = node.sni
-                
-                if request.scv or node.skip_cert_verify:
-                    base_config['skip-cert-verify'] = True
-            
-            elif node.type == 'tuic':
-                base_config.update({
-                    'uuid': node.uuid,
-                    'password': node.password,
-                    'udp': True,  # TUIC 基于 QUIC/UDP
-                })
-                
-                if node.sni:
-                    base_config['sni'] = node.sni
-                
-                if request.scv or node.skip_cert_verify:
-                    base_config['skip-cert-verify'] = True
+            # 根据协议类型添加特定配置，未注册的协议只保留基础字段
+            handler = self._TYPE_HANDLERS.get(node.type)
+            if handler is not None:
+                udp = request.udp and node.udp
+                scv = request.scv or node.skip_cert_verify
+                handler(self, node, base_config, udp, scv)
             
             # 通用配置
             if request.tfo:
@@ -419,9 +522,146 @@ class SubscriptionConverter:
             return base_config
             
         except Exception as e:
-            logger.error(f"Failed to convert node {node.name} to Clash format: {e}")
+            logger.error("Failed to convert node %s to Clash format: %s", node.name, e)
             return None
     
+    def _conv_ss(self, node: ProxyNode, base_config: Dict[str, Any], udp: bool, scv: bool):
+        """Shadowsocks 协议配置"""
+        base_config['cipher'] = node.cipher
+        base_config['password'] = node.password
+        base_config['udp'] = udp
+    
+    def _conv_ssr(self, node: ProxyNode, base_config: Dict[str, Any], udp: bool, scv: bool):
+        """ShadowsocksR 协议配置"""
+        base_config['cipher'] = node.cipher
+        base_config['password'] = node.password
+        base_config['protocol'] = node.protocol
+        base_config['protocol-param'] = node.protocol_param
+        base_config['obfs'] = node.obfs
+        base_config['obfs-param'] = node.obfs_param
+        base_config['udp'] = udp
+    
+    def _conv_vmess(self, node: ProxyNode, base_config: Dict[str, Any], udp: bool, scv: bool):
+        """VMess 协议配置"""
+        base_config['uuid'] = node.uuid
+        base_config['alterId'] = node.alterId or 0
+        base_config['cipher'] = node.cipher or 'auto'
+        base_config['udp'] = udp
+        
+        # 传输层配置
+        if node.network and node.network != 'tcp':
+            base_config['network'] = node.network
+            
+            if node.network == 'ws':
+                ws_opts = {}
+                if node.path:
+                    ws_opts['path'] = node.path
+                if node.host:
+                    ws_opts['headers'] = {'Host': node.host}
+                if ws_opts:
+                    base_config['ws-opts'] = ws_opts
+            
+            elif node.network == 'h2':
+                h2_opts = {}
+                if node.path:
+                    h2_opts['path'] = node.path
+                if node.host:
+                    h2_opts['host'] = [node.host]
+                if h2_opts:
+                    base_config['h2-opts'] = h2_opts
+            
+            elif node.network == 'grpc':
+                if node.path:
+                    base_config['grpc-opts'] = {
+                        'grpc-service-name': node.path
+                    }
+        
+        # TLS 配置
+        if node.tls:
+            base_config['tls'] = True
+            tls_opts = {}
+            
+            sni = node.sni
+            if sni:
+                tls_opts['sni'] = sni
+            
+            if scv:
+                tls_opts['skip-cert-verify'] = True
+            
+            if tls_opts:
+                base_config['tls-opts'] = tls_opts
+    
+    def _conv_vless(self, node: ProxyNode, base_config: Dict[str, Any], udp: bool, scv: bool):
+        """VLESS 协议配置"""
+        base_config['uuid'] = node.uuid
+        base_config['udp'] = udp
+        
+        # 传输层和 TLS 配置（类似 vmess）
+        if node.network and node.network != 'tcp':
+            base_config['network'] = node.network
+            # ... (类似 vmess 的传输层配置逻辑)
+        
+        if node.tls:
+            base_config['tls'] = True
+            # ... (类似 vmess 的 TLS 配置逻辑)
+    
+    def _conv_trojan(self, node: ProxyNode, base_config: Dict[str, Any], udp: bool, scv: bool):
+        """Trojan 协议配置"""
+        base_config['password'] = node.password
+        base_config['udp'] = udp
+        
+        sni = node.sni
+        if sni:
+            base_config['sni'] = sni
+        
+        if scv:
+            base_config['skip-cert-verify'] = True
+    
+    def _conv_hysteria(self, node: ProxyNode, base_config: Dict[str, Any], udp: bool, scv: bool):
+        """Hysteria / Hysteria2 协议配置"""
+        base_config['udp'] = True  # Hysteria 基于 UDP
+        
+        if node.auth_str:
+            base_config['auth-str'] = node.auth_str
+        
+        if node.up:
+            base_config['up'] = node.up
+        
+        if node.down:
+            base_config['down'] = node.down
+        
+        sni = node.sni
+        if sni:
+            base_config['sni'] = sni
+        
+        if scv:
+            base_config['skip-cert-verify'] = True
+    
+    def _conv_tuic(self, node: ProxyNode, base_config: Dict[str, Any], udp: bool, scv: bool):
+        """TUIC 协议配置"""
+        base_config['uuid'] = node.uuid
+        base_config['password'] = node.password
+        base_config['udp'] = True  # TUIC 基于 QUIC/UDP
+        
+        sni = node.sni
+        if sni:
+            base_config['sni'] = sni
+        
+        if scv:
+            base_config['skip-cert-verify'] = True
+    
+    # 协议类型到转换方法的分派表
+    _TYPE_HANDLERS = {
+        'ss': _conv_ss,
+        'ssr': _conv_ssr,
+        'vmess': _conv_vmess,
+        'vless': _conv_vless,
+        'trojan': _conv_trojan,
+        'hysteria': _conv_hysteria,
+        'hysteria2': _conv_hysteria,
+        'tuic': _conv_tuic,
+    }
+    
     def generate_subscription_url(self, config_id: str, base_url: str) -> str:
         """生成订阅链接"""
         return f"{base_url}/sub/{config_id}"
@@ -442,4 +682,13 @@ class SubscriptionConverter:
             'proxy_group_types': [
                 'select', 'url-test', 'fallback', 'load-balance', 'relay'
             ]
-        }
\ No newline at end of file
+        }
+
+
+# 全局订阅转换器实例
+global_subscription_converter = SubscriptionConverter()
+
+
+def get_subscription_converter() -> SubscriptionConverter:
+    """获取全局订阅转换器"""
+    return global_subscription_converter
@@ -145,9 +145,9 @@ class EnhancedConverter:
         self.singbox_generator = SingBoxConfigGenerator()
     
     async def convert_to_singbox(self, nodes: List[ProxyNode]) -> str:
-        result = self.singbox_generator.generate_full_config(nodes)
+        result = await self.singbox_generator.generate_full_config_async(nodes)
         if result.success:
-            return json.dumps(result.config, indent=2)
+            return self.singbox_generator.to_json(result.config, indent=True)
         else:
             raise ValueError(f"配置生成失败: {{result.error}}")
 ```
@@ -7,7 +7,7 @@ import re
 import json
 import base64
 import urllib.parse
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 import yaml
 import logging
 
@@ -32,12 +32,12 @@ class SubscriptionParser:
             'wireguard': self._parse_wireguard,
         }
     
-    def _safe_b64decode(self, encoded_str: str) -> str:
+    def _safe_b64decode(self, encoded_str: Union[str, bytes]) -> str:
         """
         安全的Base64解码，自动修复padding问题
         
         Args:
-            encoded_str: Base64编码的字符串
+            encoded_str: Base64编码的字符串或字节串
             
         Returns:
             解码后的字符串
@@ -52,29 +52,33 @@ class SubscriptionParser:
             # 自动修复Base64 padding
             missing_padding = len(encoded_str) % 4
             if missing_padding:
-                encoded_str += '=' * (4 - missing_padding)
+                padding = b'=' if isinstance(encoded_str, bytes) else '='
+                encoded_str += padding * (4 - missing_padding)
             
             return base64.b64decode(encoded_str).decode('utf-8')
         except Exception as e:
             logger.debug(f"Base64 decode failed for '{encoded_str[:50]}...': {e}")
             raise
     
-    def parse_subscription(self, content: str) -> List[ProxyNode]:
+    def parse_subscription(self, content: Union[str, bytes]) -> List[ProxyNode]:
         """
         解析订阅内容
         
         Args:
-            content: 订阅内容（base64编码或原始格式）
+            content: 订阅内容（base64编码或原始格式），可直接传入响应字节
             
         Returns:
             解析后的代理节点列表
         """
         try:
-            # 尝试 base64 解码
+            # 尝试 base64 解码（字节内容直接解码，无需先转换为字符串）
             try:
                 decoded_content = self._safe_b64decode(content)
             except Exception:
-                decoded_content = content
+                if isinstance(content, bytes):
+                    decoded_content = content.decode('utf-8', errors='replace')
+                else:
+                    decoded_content = content
             
             # 检查是否为 Clash 配置格式
             if self._is_clash_config(decoded_content):
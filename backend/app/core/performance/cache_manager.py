@@ -3,13 +3,19 @@
 提供高效的缓存策略，优化弱性能VPS环境下的订阅转换性能
 """
 
+import os
+import math
 import time
+import gzip
+import pickle
+import base64
 import hashlib
 import json
 import asyncio
 import logging
+from collections import Counter
 from typing import Any, Optional, Dict, List, Callable, TypeVar, Generic
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, fields, is_dataclass
 from enum import Enum
 import threading
 from functools import wraps
@@ -159,6 +165,23 @@ class MemoryCache:
             self._cache.clear()
             self.stats.memory_usage = 0
 
+    def trim(self, fraction: float = 0.5) -> int:
+        """按淘汰策略释放缓存，直到内存占用降至当前的 (1 - fraction)，返回淘汰数量"""
+        with self._lock:
+            self._cleanup_expired()
+            target = self.stats.memory_usage * (1 - fraction)
+            # 只排序一次，按淘汰顺序依次移除，避免每淘汰一项都遍历全部缓存
+            score, reverse = self._eviction_key()
+            evicted = 0
+            for key in sorted(self._cache, key=score, reverse=reverse):
+                if self.stats.memory_usage <= target:
+                    break
+                item = self._cache.pop(key)
+                self.stats.memory_usage -= item.size
+                self.stats.evictions += 1
+                evicted += 1
+            return evicted
+
     def keys(self) -> List[str]:
         """获取所有键"""
         with self._lock:
@@ -207,33 +230,38 @@ class MemoryCache:
             if not self._evict_one():
                 break  # 无法进一步释放空间
 
-    def _evict_one(self) -> bool:
-        """根据策略淘汰一个项"""
-        if not self._cache:
-            return False
-
+    def _eviction_key(self) -> tuple[Callable[[str], float], bool]:
+        """返回当前策略的排序函数及是否降序，排在最前的键最先被淘汰"""
+        cache = self._cache
         if self.strategy == CacheStrategy.LRU:
             # 最近最少使用
-            key_to_evict = min(self._cache.keys(), 
-                             key=lambda k: self._cache[k].last_accessed)
+            return (lambda k: cache[k].last_accessed), False
         elif self.strategy == CacheStrategy.LFU:
             # 最少使用频率
-            key_to_evict = min(self._cache.keys(), 
-                             key=lambda k: self._cache[k].access_count)
+            return (lambda k: cache[k].access_count), False
         elif self.strategy == CacheStrategy.TTL:
             # 最早创建的
-            key_to_evict = min(self._cache.keys(), 
-                             key=lambda k: self._cache[k].created_at)
-        else:  # ADAPTIVE
-            # 综合考虑访问时间、频率和大小
-            def adaptive_score(key):
-                item = self._cache[key]
-                age = time.time() - item.last_accessed
-                frequency = item.access_count
-                size_factor = item.size / 1024  # KB
-                return age * size_factor / (frequency + 1)
-            
-            key_to_evict = max(self._cache.keys(), key=adaptive_score)
+            return (lambda k: cache[k].created_at), False
+
+        # ADAPTIVE：综合考虑访问时间、频率和大小，得分最高的先淘汰
+        now = time.time()
+
+        def adaptive_score(key):
+            item = cache[key]
+            age = now - item.last_accessed
+            frequency = item.access_count
+            size_factor = item.size / 1024  # KB
+            return age * size_factor / (frequency + 1)
+
+        return adaptive_score, True
+
+    def _evict_one(self) -> bool:
+        """根据策略淘汰一个项"""
+        if not self._cache:
+            return False
+
+        score, reverse = self._eviction_key()
+        key_to_evict = (max if reverse else min)(self._cache, key=score)
 
         # 执行淘汰
         item = self._cache.pop(key_to_evict)
@@ -247,6 +275,8 @@ class MemoryCache:
         try:
             if isinstance(value, str):
                 return len(value.encode('utf-8'))
+            elif isinstance(value, (bytes, bytearray)):
+                return len(value)
             elif isinstance(value, (int, float)):
                 return 8
             elif isinstance(value, bool):
@@ -256,6 +286,9 @@ class MemoryCache:
             elif isinstance(value, dict):
                 return sum(self._estimate_size(k) + self._estimate_size(v) 
                           for k, v in value.items()) + 64
+            elif is_dataclass(value):
+                return sum(self._estimate_size(getattr(value, f.name))
+                          for f in fields(value)) + 64
             else:
                 # 对于复杂对象，使用JSON序列化估算
                 return len(json.dumps(value, default=str, ensure_ascii=False).encode('utf-8'))
@@ -263,26 +296,156 @@ class MemoryCache:
             return 1024  # 默认值
 
 
+class RedisCache:
+    """Redis 缓存实现
+
+    缓存数据存放在 Redis 中，多个 worker 进程共享命中；
+    过期由 Redis 服务端 TTL 处理，无需本地清理。
+
+    缓存值使用 pickle 序列化，读取时会被反序列化执行，
+    因此 Redis 实例必须可信：仅本服务可写，不要对外暴露或与其他应用共用。
+    Redis 不可用时按缓存未命中/写入跳过处理，不影响转换接口。
+    """
+
+    def __init__(self,
+                 url: str,
+                 default_ttl: float = 300,
+                 key_prefix: str = "clashsub:"):
+        import redis  # 可选依赖，仅在启用 Redis 后端时需要
+
+        self._client = redis.Redis.from_url(url)
+        self._redis_error = redis.RedisError
+        self.default_ttl = default_ttl
+        self.key_prefix = key_prefix
+        self.stats = CacheStats()
+        self.logger = logging.getLogger("cache.redis")
+
+    def get(self, key: str) -> Optional[Any]:
+        """获取缓存项，Redis 异常或数据损坏时视为未命中"""
+        try:
+            data = self._client.get(self.key_prefix + key)
+        except self._redis_error as e:
+            self.logger.warning(f"Redis 读取失败，按未命中处理: {e}")
+            self.stats.misses += 1
+            return None
+
+        if data is None:
+            self.stats.misses += 1
+            return None
+
+        try:
+            value = pickle.loads(data)
+        except Exception as e:
+            self.logger.warning(f"缓存数据反序列化失败: {key} ({e})")
+            self.stats.misses += 1
+            return None
+
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """设置缓存项（SETEX，由服务端负责过期），Redis 异常时跳过写入"""
+        expire = max(1, math.ceil(ttl or self.default_ttl))
+        try:
+            self._client.setex(self.key_prefix + key, expire, pickle.dumps(value))
+        except self._redis_error as e:
+            self.logger.warning(f"Redis 写入失败，跳过缓存: {e}")
+            return False
+        return True
+
+    def delete(self, key: str) -> bool:
+        """删除缓存项"""
+        try:
+            return self._client.delete(self.key_prefix + key) > 0
+        except self._redis_error as e:
+            self.logger.warning(f"Redis 删除失败: {e}")
+            return False
+
+    def clear(self):
+        """清空缓存（仅删除本服务前缀下的键）"""
+        try:
+            for raw_key in self._client.scan_iter(match=self.key_prefix + "*"):
+                self._client.delete(raw_key)
+        except self._redis_error as e:
+            self.logger.warning(f"Redis 清空失败: {e}")
+
+    def trim(self, fraction: float = 0.5) -> int:
+        """内存由 Redis 服务端的 maxmemory 策略管理，本地无需淘汰"""
+        return 0
+
+    def keys(self, pattern: str = "*") -> List[str]:
+        """获取所有键（使用 SCAN，避免阻塞 Redis）"""
+        prefix_len = len(self.key_prefix)
+        try:
+            return [
+                raw_key.decode('utf-8')[prefix_len:]
+                for raw_key in self._client.scan_iter(match=self.key_prefix + pattern)
+            ]
+        except self._redis_error as e:
+            self.logger.warning(f"Redis 扫描键失败: {e}")
+            return []
+
+    def size(self) -> int:
+        """获取缓存项数量"""
+        return len(self.keys())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取统计信息"""
+        try:
+            memory_info = self._client.info('memory')
+        except self._redis_error as e:
+            self.logger.warning(f"Redis 状态获取失败: {e}")
+            memory_info = {}
+        return {
+            'size': self.size(),
+            'memory_usage_mb': memory_info.get('used_memory', 0) / (1024 * 1024),
+            'hit_rate': self.stats.hit_rate,
+            'hits': self.stats.hits,
+            'misses': self.stats.misses,
+            'evictions': self.stats.evictions,
+            'uptime': self.stats.uptime,
+        }
+
+    def _cleanup_expired(self):
+        """过期由 Redis 服务端处理"""
+        pass
+
+
 class CacheManager:
     """缓存管理器"""
 
     def __init__(self, 
                  memory_cache_size: int = 1000,
                  memory_cache_mb: int = 128,
-                 enable_compression: bool = True):
-        self.memory_cache = MemoryCache(
-            max_size=memory_cache_size,
-            max_memory_mb=memory_cache_mb,
-            strategy=CacheStrategy.ADAPTIVE
-        )
-        self.enable_compression = enable_compression
+                 enable_compression: bool = True,
+                 backend: Optional[str] = None):
         self.logger = logging.getLogger("cache.manager")
+
+        # 缓存后端：默认进程内存，设置 CACHE_BACKEND=redis 后使用 Redis 在 worker 间共享
+        backend = (backend or os.getenv("CACHE_BACKEND", "memory")).lower()
+        self.memory_cache = None
+        if backend == "redis":
+            try:
+                self.memory_cache = RedisCache(
+                    url=os.getenv("REDIS_URL", "redis://localhost:6379/0")
+                )
+            except ImportError:
+                self.logger.warning("未安装 redis 包，回退到内存缓存")
+
+        if self.memory_cache is None:
+            self.memory_cache = MemoryCache(
+                max_size=memory_cache_size,
+                max_memory_mb=memory_cache_mb,
+                strategy=CacheStrategy.ADAPTIVE
+            )
+        self.enable_compression = enable_compression
         
         # 不同类型数据的缓存配置
         self.cache_configs = {
             'subscription': {'ttl': 300, 'strategy': CacheStrategy.LRU},
             'parsed_nodes': {'ttl': 600, 'strategy': CacheStrategy.LFU},
-            'generated_config': {'ttl': 180, 'strategy': CacheStrategy.LRU},
+            # 下载接口直接读取缓存内容，不进行压缩
+            'generated_config': {'ttl': 180, 'strategy': CacheStrategy.LRU, 'compress': False},
             'remote_config': {'ttl': 1800, 'strategy': CacheStrategy.TTL},
         }
 
@@ -298,14 +461,25 @@ class CacheManager:
         cache_key = f"{cache_type}:{key}"
         return self.memory_cache.get(cache_key)
 
-    def set(self, cache_type: str, key: str, value: Any) -> bool:
-        """设置缓存"""
+    @property
+    def shares_references(self) -> bool:
+        """缓存后端是否直接保存对象引用（内存后端），此时修改 get 返回的对象即更新缓存"""
+        return isinstance(self.memory_cache, MemoryCache)
+
+    def get_ttl(self, cache_type: str) -> float:
+        """获取指定类型缓存的 TTL（秒）"""
+        return self.cache_configs.get(cache_type, {}).get('ttl', 300)
+
+    def set(self, cache_type: str, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """设置缓存，ttl 为空时使用该类型的默认 TTL"""
         cache_key = f"{cache_type}:{key}"
         config = self.cache_configs.get(cache_type, {})
-        ttl = config.get('ttl', 300)
+        if ttl is None:
+            ttl = config.get('ttl', 300)
         
         # 压缩大型数据
-        if self.enable_compression and self._should_compress(value):
+        if (self.enable_compression and config.get('compress', True)
+                and self._should_compress(value)):
             value = self._compress_value(value)
         
         return self.memory_cache.set(cache_key, value, ttl)
@@ -328,15 +502,10 @@ class CacheManager:
         """获取统计信息"""
         stats = self.memory_cache.get_stats()
         
-        # 按类型统计
-        type_stats = {}
-        for key in self.memory_cache.keys():
-            cache_type = key.split(':', 1)[0]
-            if cache_type not in type_stats:
-                type_stats[cache_type] = 0
-            type_stats[cache_type] += 1
+        # 按类型统计（内存占用由 memory_usage 计数器维护，无需遍历缓存值）
+        type_stats = Counter(key.partition(':')[0] for key in self.memory_cache.keys())
         
-        stats['types'] = type_stats
+        stats['types'] = dict(type_stats)
         return stats
 
     def _should_compress(self, value: Any) -> bool:
@@ -349,9 +518,6 @@ class CacheManager:
 
     def _compress_value(self, value: Any) -> Dict[str, Any]:
         """压缩值"""
-        import gzip
-        import base64
-        
         try:
             json_str = json.dumps(value, default=str, ensure_ascii=False)
             compressed = gzip.compress(json_str.encode('utf-8'))
@@ -367,9 +533,6 @@ class CacheManager:
 
     def _decompress_value(self, value: Dict[str, Any]) -> Any:
         """解压缩值"""
-        import gzip
-        import base64
-        
         if not isinstance(value, dict) or not value.get('_compressed'):
             return value
         
@@ -0,0 +1,157 @@
+"""
+DNS 解析缓存 - 为 httpx 连接池提供带过期时间的域名解析缓存
+"""
+
+import asyncio
+import ipaddress
+import logging
+import socket
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import httpcore
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class CachingDNSBackend(httpcore.AsyncNetworkBackend):
+    """
+    带 DNS 缓存的网络后端
+
+    建立 TCP 连接前先查询进程内缓存，命中时直接使用缓存的 IP 地址，
+    未命中时通过事件循环的 getaddrinfo 解析并缓存结果
+    """
+
+    def __init__(self,
+                 ttl: float = 300.0,
+                 maxsize: int = 1024,
+                 backend: Optional[httpcore.AsyncNetworkBackend] = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._backend = backend or httpcore.AnyIOBackend()
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+
+    async def resolve(self, host: str, port: int, timeout: Optional[float] = None) -> List[str]:
+        """解析主机名，返回去重后的 IP 地址列表"""
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+
+        key = (host, port)
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        try:
+            infos = await asyncio.wait_for(
+                asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM),
+                timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise httpcore.ConnectError(f"DNS resolution failed for {host}: {e}") from e
+
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        if not addresses:
+            raise httpcore.ConnectError(f"DNS resolution returned no address for {host}")
+
+        if len(self._cache) >= self.maxsize:
+            for k in [k for k, (expires_at, _) in self._cache.items() if expires_at <= now]:
+                del self._cache[k]
+            while len(self._cache) >= self.maxsize:
+                del self._cache[next(iter(self._cache))]
+        self._cache[key] = (now + self.ttl, addresses)
+
+        logger.debug("Resolved %s to %s", host, addresses)
+        return addresses
+
+    def invalidate(self, host: str, port: int):
+        """移除指定主机的缓存记录"""
+        self._cache.pop((host, port), None)
+
+    async def connect_tcp(self,
+                          host: str,
+                          port: int,
+                          timeout: Optional[float] = None,
+                          local_address: Optional[str] = None,
+                          socket_options: Optional[Iterable] = None) -> httpcore.AsyncNetworkStream:
+        """
+        依次尝试解析到的地址建立连接，全部失败时清除该主机的缓存
+
+        timeout 是解析加连接的总时限，剩余时间在未尝试的地址间平均分配，
+        避免多个失效地址让一次连接耗时成倍增长
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        addresses = await self.resolve(host, port, timeout)
+
+        last_error: Optional[Exception] = None
+        for index, address in enumerate(addresses):
+            attempt_timeout = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                attempt_timeout = remaining / (len(addresses) - index)
+            try:
+                return await self._backend.connect_tcp(
+                    address, port,
+                    timeout=attempt_timeout,
+                    local_address=local_address,
+                    socket_options=socket_options
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                last_error = e
+
+        self.invalidate(host, port)
+        if last_error is None:
+            raise httpcore.ConnectTimeout(f"Timed out connecting to {host}:{port}")
+        raise last_error
+
+    async def connect_unix_socket(self,
+                                  path: str,
+                                  timeout: Optional[float] = None,
+                                  socket_options: Optional[Iterable] = None) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(
+            path, timeout=timeout, socket_options=socket_options
+        )
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class CachingDNSTransport(httpx.AsyncHTTPTransport):
+    """
+    使用 DNS 缓存后端的 httpx 传输层
+
+    直接构建 httpcore 连接池并传入 network_backend，不经过代理；
+    需要走环境变量代理时应改用 httpx 默认传输层
+    """
+
+    def __init__(self,
+                 verify: Any = True,
+                 cert: Any = None,
+                 trust_env: bool = True,
+                 http1: bool = True,
+                 http2: bool = False,
+                 limits: httpx.Limits = httpx.Limits(max_connections=100, max_keepalive_connections=20,
+                                                     keepalive_expiry=5.0),
+                 local_address: Optional[str] = None,
+                 retries: int = 0,
+                 socket_options: Optional[Iterable] = None,
+                 dns_backend: Optional[CachingDNSBackend] = None):
+        self.dns_backend = dns_backend or CachingDNSBackend()
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(verify=verify, cert=cert, trust_env=trust_env),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=http1,
+            http2=http2,
+            local_address=local_address,
+            retries=retries,
+            socket_options=socket_options,
+            network_backend=self.dns_backend,
+        )
@@ -5,6 +5,7 @@
 
 import asyncio
 import time
+import httpx
 import psutil
 import logging
 from typing import Dict, Any, List, Optional, Callable
@@ -343,8 +344,6 @@ class PerformanceOptimizer:
 
     async def _fetch_single_subscription(self, url: str) -> str:
         """获取单个订阅"""
-        import httpx
-        
         # 检查缓存
         if self.config['enable_caching']:
             cache_key = f"sub_{hash(url)}"
@@ -417,11 +416,10 @@ class PerformanceOptimizer:
             if cached:
                 return cached
         
-        # 实际解析（这里需要调用实际的解析器）
-        from ..parser import SubscriptionParser
+        # 实际解析，复用全局转换器持有的解析器
+        from ..converter import get_subscription_converter
         
-        parser = SubscriptionParser()
-        nodes = parser.parse_subscription(content)
+        nodes = get_subscription_converter().parser.parse_subscription(content)
         
         # 缓存结果
         if self.config['enable_caching']:
@@ -432,9 +430,9 @@ class PerformanceOptimizer:
     async def _generate_config(self, nodes: List[Any], format_type: str) -> str:
         """生成配置"""
         # 这里需要调用实际的配置生成器
-        from ..converter import SubscriptionConverter
+        from ..converter import get_subscription_converter
         
-        converter = SubscriptionConverter()
+        converter = get_subscription_converter()
         # 根据format_type生成相应配置
         # 这里需要适配实际的接口
         
@@ -7,6 +7,7 @@ from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional, Type, Union
 from enum import Enum
 import logging
+import urllib.parse
 
 from ..models.schemas import ProxyNode
 
@@ -231,7 +232,6 @@ class BaseProtocolParser(IProtocolParser):
 
     def _extract_basic_info(self, url: str) -> tuple:
         """提取URL中的基础信息：scheme, userinfo, host, port, path, query, fragment"""
-        import urllib.parse
         parsed = urllib.parse.urlparse(url)
         return (
             parsed.scheme,
@@ -261,7 +261,6 @@ class BaseProtocolParser(IProtocolParser):
 
     def _parse_query_params(self, query_string: str) -> Dict[str, str]:
         """解析查询参数"""
-        import urllib.parse
         if not query_string:
             return {}
         return dict(urllib.parse.parse_qsl(query_string))
@@ -288,11 +287,7 @@ class BaseConfigGenerator(IConfigGenerator):
 
     def _validate_required_fields(self, node: ProxyNode, fields: List[str]) -> List[str]:
         """验证必需字段"""
-        errors = []
-        for field in fields:
-            if not hasattr(node, field) or getattr(node, field) is None:
-                errors.append(f"缺少必需字段: {field}")
-        return errors
+        return [f"缺少必需字段: {field}" for field in fields if getattr(node, field, None) is None]
 
 
 # 性能监控装饰器
@@ -5,7 +5,8 @@
 import re
 import httpx
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
 from configparser import ConfigParser
 from io import StringIO
 
@@ -14,6 +15,90 @@ from ..models.schemas import ProxyGroup, Rule
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=256)
+def _compile_pattern(pattern: str) -> re.Pattern:
+    """编译忽略大小写的正则表达式，相同模式只编译一次"""
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def _as_pattern(pattern: Union[str, re.Pattern]) -> re.Pattern:
+    """将字符串模式转换为已编译的正则表达式"""
+    return pattern if isinstance(pattern, re.Pattern) else _compile_pattern(pattern)
+
+
+# 地区关键字到国旗 Emoji 的映射，按顺序匹配，首个命中的地区生效
+_FLAG_PATTERNS = tuple(
+    (re.compile(pattern, re.IGNORECASE), flag)
+    for pattern, flag in {
+        # 中国地区
+        r'港|hk|hong.?kong': '🇭🇰',
+        r'台|tw|taiwan': '🇹🇼',
+        r'澳门|macao': '🇲🇴',
+        r'中国|china|cn': '🇨🇳',
+        
+        # 亚洲
+        r'日本|jp|japan': '🇯🇵',
+        r'韩国|kr|korea': '🇰🇷',
+        r'新加坡|sg|singapore': '🇸🇬',
+        r'马来西亚|my|malaysia': '🇲🇾',
+        r'泰国|th|thailand': '🇹🇭',
+        r'印度|in|india': '🇮🇳',
+        r'菲律宾|ph|philippines': '🇵🇭',
+        r'印尼|id|indonesia': '🇮🇩',
+        r'越南|vn|vietnam': '🇻🇳',
+        
+        # 欧洲
+        r'英国|uk|britain|united.?kingdom': '🇬🇧',
+        r'法国|fr|france': '🇫🇷',
+        r'德国|de|germany': '🇩🇪',
+        r'荷兰|nl|netherlands': '🇳🇱',
+        r'意大利|it|italy': '🇮🇹',
+        r'西班牙|es|spain': '🇪🇸',
+        r'俄罗斯|ru|russia': '🇷🇺',
+        r'瑞士|ch|switzerland': '🇨🇭',
+        r'瑞典|se|sweden': '🇸🇪',
+        r'挪威|no|norway': '🇳🇴',
+        r'芬兰|fi|finland': '🇫🇮',
+        r'丹麦|dk|denmark': '🇩🇰',
+        r'波兰|pl|poland': '🇵🇱',
+        r'土耳其|tr|turkey': '🇹🇷',
+        
+        # 美洲
+        r'美国|us|united.?states|america': '🇺🇸',
+        r'加拿大|ca|canada': '🇨🇦',
+        r'墨西哥|mx|mexico': '🇲🇽',
+        r'巴西|br|brazil': '🇧🇷',
+        r'阿根廷|ar|argentina': '🇦🇷',
+        
+        # 大洋洲
+        r'澳大利亚|au|australia': '🇦🇺',
+        r'新西兰|nz|new.?zealand': '🇳🇿',
+        
+        # 非洲
+        r'南非|za|south.?africa': '🇿🇦',
+        r'埃及|eg|egypt': '🇪🇬',
+        
+        # 中东
+        r'以色列|il|israel': '🇮🇱',
+        r'阿联酋|ae|uae': '🇦🇪',
+    }.items()
+)
+
+
+@lru_cache(maxsize=4096)
+def _detect_flag(node_name: str) -> Optional[str]:
+    """识别节点名称所属地区的国旗，同名节点只匹配一次"""
+    for pattern, flag in _FLAG_PATTERNS:
+        if pattern.search(node_name):
+            return flag
+    return None
+
+
+def _starts_with_flag(node_name: str) -> bool:
+    """节点名称是否已以国旗 Emoji（区域指示符号）开头"""
+    return bool(node_name) and '\U0001F1E6' <= node_name[0] <= '\U0001F1FF'
+
+
 class RuleProcessor:
     """规则处理器"""
     
@@ -349,7 +434,7 @@ class RuleProcessor:
                 # 地区匹配格式，如 .香港|HK.
                 pattern_str = proxies_part[1:-1]  # 移除首尾的点
                 try:
-                    pattern = re.compile(pattern_str, re.IGNORECASE)
+                    pattern = _compile_pattern(pattern_str)
                     filtered_nodes = [node for node in nodes if pattern.search(node)]
                     proxies.extend(filtered_nodes)
                     logger.info(f"Regional group {name} matched {len(filtered_nodes)} nodes with pattern: {pattern_str}")
@@ -375,7 +460,7 @@ class RuleProcessor:
                         if '.*' in item or item.startswith('^') or item.endswith('$'):
                             # 正则表达式过滤
                             try:
-                                pattern = re.compile(item, re.IGNORECASE)
+                                pattern = _compile_pattern(item)
                                 filtered_nodes = [node for node in nodes if pattern.search(node)]
                                 proxies.extend(filtered_nodes)
                             except re.error as e:
@@ -504,32 +589,32 @@ class RuleProcessor:
             return None
     
     def apply_node_filters(self, 
-                          nodes: List[str],
-                          include_pattern: Optional[str] = None,
-                          exclude_pattern: Optional[str] = None) -> List[str]:
+                          nodes: Sequence[str],
+                          include_pattern: Optional[Union[str, re.Pattern]] = None,
+                          exclude_pattern: Optional[Union[str, re.Pattern]] = None) -> List[str]:
         """
         应用节点过滤规则
         
         Args:
             nodes: 原始节点列表
-            include_pattern: 包含规则（正则表达式）
-            exclude_pattern: 排除规则（正则表达式）
+            include_pattern: 包含规则（正则表达式字符串或已编译的正则）
+            exclude_pattern: 排除规则（正则表达式字符串或已编译的正则）
             
         Returns:
             过滤后的节点列表
         """
         try:
-            filtered_nodes = nodes[:]
+            filtered_nodes = list(nodes)
             
             # 应用包含规则
             if include_pattern:
-                pattern = re.compile(include_pattern, re.IGNORECASE)
-                filtered_nodes = [node for node in filtered_nodes if pattern.search(node)]
+                search = _as_pattern(include_pattern).search
+                filtered_nodes = [node for node in filtered_nodes if search(node)]
             
             # 应用排除规则
             if exclude_pattern:
-                pattern = re.compile(exclude_pattern, re.IGNORECASE)
-                filtered_nodes = [node for node in filtered_nodes if not pattern.search(node)]
+                search = _as_pattern(exclude_pattern).search
+                filtered_nodes = [node for node in filtered_nodes if not search(node)]
             
             return filtered_nodes
             
@@ -556,15 +641,23 @@ class RuleProcessor:
             if not rename_rules:
                 return {node: node for node in nodes}
             
+            # 预先编译重命名规则，避免对每个节点重复解析
+            compiled_rules = []
+            for rule in rename_rules:
+                try:
+                    parts = rule.split(',', 1)
+                    if len(parts) == 2:
+                        pattern, replacement = parts
+                        compiled_rules.append((_compile_pattern(pattern), replacement, rule))
+                except Exception as e:
+                    logger.warning(f"Failed to apply rename rule {rule}: {e}")
+            
             for node in nodes:
                 new_name = node
                 
-                for rule in rename_rules:
+                for pattern, replacement, rule in compiled_rules:
                     try:
-                        parts = rule.split(',', 1)
-                        if len(parts) == 2:
-                            pattern, replacement = parts
-                            new_name = re.sub(pattern, replacement, new_name, flags=re.IGNORECASE)
+                        new_name = pattern.sub(replacement, new_name)
                     except Exception as e:
                         logger.warning(f"Failed to apply rename rule {rule}: {e}")
                         continue
@@ -587,65 +680,12 @@ class RuleProcessor:
         Returns:
             添加 Emoji 后的节点名称
         """
-        flag_map = {
-            # 中国地区
-            r'港|hk|hong.?kong': '🇭🇰',
-            r'台|tw|taiwan': '🇹🇼',
-            r'澳门|macao': '🇲🇴',
-            r'中国|china|cn': '🇨🇳',
-            
-            # 亚洲
-            r'日本|jp|japan': '🇯🇵',
-            r'韩国|kr|korea': '🇰🇷',
-            r'新加坡|sg|singapore': '🇸🇬',
-            r'马来西亚|my|malaysia': '🇲🇾',
-            r'泰国|th|thailand': '🇹🇭',
-            r'印度|in|india': '🇮🇳',
-            r'菲律宾|ph|philippines': '🇵🇭',
-            r'印尼|id|indonesia': '🇮🇩',
-            r'越南|vn|vietnam': '🇻🇳',
-            
-            # 欧洲
-            r'英国|uk|britain|united.?kingdom': '🇬🇧',
-            r'法国|fr|france': '🇫🇷',
-            r'德国|de|germany': '🇩🇪',
-            r'荷兰|nl|netherlands': '🇳🇱',
-            r'意大利|it|italy': '🇮🇹',
-            r'西班牙|es|spain': '🇪🇸',
-            r'俄罗斯|ru|russia': '🇷🇺',
-            r'瑞士|ch|switzerland': '🇨🇭',
-            r'瑞典|se|sweden': '🇸🇪',
-            r'挪威|no|norway': '🇳🇴',
-            r'芬兰|fi|finland': '🇫🇮',
-            r'丹麦|dk|denmark': '🇩🇰',
-            r'波兰|pl|poland': '🇵🇱',
-            r'土耳其|tr|turkey': '🇹🇷',
-            
-            # 美洲
-            r'美国|us|united.?states|america': '🇺🇸',
-            r'加拿大|ca|canada': '🇨🇦',
-            r'墨西哥|mx|mexico': '🇲🇽',
-            r'巴西|br|brazil': '🇧🇷',
-            r'阿根廷|ar|argentina': '🇦🇷',
-            
-            # 大洋洲
-            r'澳大利亚|au|australia': '🇦🇺',
-            r'新西兰|nz|new.?zealand': '🇳🇿',
-            
-            # 非洲
-            r'南非|za|south.?africa': '🇿🇦',
-            r'埃及|eg|egypt': '🇪🇬',
-            
-            # 中东
-            r'以色列|il|israel': '🇮🇱',
-            r'阿联酋|ae|uae': '🇦🇪',
-        }
-        
-        for pattern, flag in flag_map.items():
-            if re.search(pattern, node_name, re.IGNORECASE):
-                # 如果节点名称中还没有这个国旗，则添加
-                if flag not in node_name:
-                    return f"{flag} {node_name}"
-                return node_name
+        # 已带国旗的名称（例如重复处理的节点）无需再次匹配
+        if _starts_with_flag(node_name):
+            return node_name
         
-        return node_name
\ No newline at end of file
+        flag = _detect_flag(node_name)
+        # 如果节点名称中还没有这个国旗，则添加
+        if flag is None or flag in node_name:
+            return node_name
+        return f"{flag} {node_name}"
\ No newline at end of file
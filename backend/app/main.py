@@ -13,7 +13,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
-from .api.converter import router as converter_router
+from .api.converter import router as converter_router, close_http_clients
 from .models.schemas import HealthResponse, ErrorResponse
 from .utils.helpers import setup_logging, get_client_ip
 
@@ -39,6 +39,7 @@ async def lifespan(app: FastAPI):
     yield
     
     # 关闭时执行
+    await close_http_clients()
     logger.info("🛑 Clash 订阅转换服务关闭")
 
 
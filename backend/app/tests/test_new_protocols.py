@@ -511,17 +511,19 @@ class TestCompatibilityAndRecovery:
 
     def test_circuit_breaker(self):
         """测试熔断器"""
+        from ..core.compatibility.error_recovery import CircuitState
+
         circuit_breaker = self.recovery_manager.get_circuit_breaker('test_operation')
         
         # 初始状态应该是 CLOSED
-        assert circuit_breaker.state == 'CLOSED'
+        assert circuit_breaker.state == CircuitState.CLOSED
         
         # 模拟连续失败
         for _ in range(6):  # 超过默认阈值 5
             circuit_breaker._on_failure()
         
         # 应该变为 OPEN 状态
-        assert circuit_breaker.state == 'OPEN'
+        assert circuit_breaker.state == CircuitState.OPEN
 
 
 class TestIntegration:
@@ -159,12 +159,16 @@ class TestConverterAPI:
         })
         assert response.status_code == 422
         
-        # 无效的 URL 格式 - 现在会返回500因为内部处理错误
+        # 无效的 URL 格式
         response = client.post("/api/convert", json={
             "url": ["not-a-url"],
             "target": "clash"
         })
-        assert response.status_code in [400, 500]  # 允许两种响应
+        assert response.status_code == 400
+        
+        # GET 接口同样返回 400，而不是被包装为 500
+        response = client.get("/api/convert", params={"url": "not-a-url"})
+        assert response.status_code == 400
     
     def test_download_config_not_found(self):
         """测试下载不存在的配置"""
@@ -235,8 +239,7 @@ class TestSubscriptionDownload:
     def setup_method(self):
         """测试前准备"""
         # 模拟添加一个配置到缓存
-        from app.api.converter import cache_manager
-        from datetime import datetime
+        from app.api.converter import cache_manager, _build_cached_config
         
         test_config = """port: 7890
 socks-port: 7891
@@ -258,11 +261,8 @@ proxy-groups:
 rules:
   - MATCH,🚀 节点选择"""
         
-        cache_manager.set('generated_config', "test123", {
-            'config': test_config,
-            'timestamp': datetime.now(),
-            'nodes_count': 1
-        })
+        cache_manager.set('generated_config', "test123",
+                          _build_cached_config("test123", test_config, 1))
     
     def test_download_config_yaml(self):
         """测试下载 YAML 格式配置"""
@@ -288,6 +288,31 @@ rules:
         assert "proxies" in data
         assert data["port"] == 7890
     
+    def test_download_config_json_memoized(self):
+        """测试 JSON 格式结果在首次下载后被缓存"""
+        from app.api.converter import cache_manager
+        
+        first = client.get("/api/sub/test123?format=json")
+        assert first.status_code == 200
+        
+        cached_data = cache_manager.get('generated_config', "test123")
+        assert cached_data.config_json == first.json()
+        
+        second = client.get("/api/sub/test123?format=json")
+        assert second.json() == first.json()
+    
+    def test_download_config_json_keeps_ttl(self):
+        """测试首次 JSON 下载不会重新写入缓存、延长过期时间"""
+        from app.api.converter import cache_manager
+        
+        item = cache_manager.memory_cache._cache["generated_config:test123"]
+        created_at = item.created_at
+        
+        response = client.get("/api/sub/test123?format=json")
+        assert response.status_code == 200
+        assert cache_manager.memory_cache._cache["generated_config:test123"] is item
+        assert item.created_at == created_at
+    
     def test_download_config_custom_filename(self):
         """测试自定义文件名下载"""
         response = client.get("/api/sub/test123?filename=my-config.yaml")
@@ -295,6 +320,25 @@ rules:
         assert response.status_code == 200
         assert 'filename="my-config.yaml"' in response.headers.get("content-disposition", "")
     
+    def test_download_config_not_modified(self):
+        """测试携带 If-None-Match 时返回 304"""
+        response = client.get("/api/sub/test123")
+        etag = response.headers.get("etag")
+        assert etag
+        
+        response = client.get("/api/sub/test123", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+    
+    def test_download_config_unicode_filename(self):
+        """测试中文文件名按 RFC 5987 编码"""
+        response = client.get("/api/sub/test123", params={"filename": "我的配置"})
+        
+        assert response.status_code == 200
+        disposition = response.headers.get("content-disposition", "")
+        assert 'filename="clash_config_test123.yml"' in disposition
+        assert "filename*=UTF-8''%E6%88%91%E7%9A%84%E9%85%8D%E7%BD%AE.yml" in disposition
+    
     def test_get_config_info(self):
         """测试获取配置信息"""
         response = client.get("/api/sub/test123/info")
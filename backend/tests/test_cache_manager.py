@@ -0,0 +1,37 @@
+"""
+缓存管理器测试
+"""
+
+import pytest
+from app.core.performance.cache_manager import MemoryCache, RedisCache, CacheStrategy
+
+
+class TestMemoryCache:
+    """内存缓存测试类"""
+
+    def test_trim_keeps_recent_entries(self):
+        """测试按 LRU 顺序释放一半内存，保留最近访问的项"""
+        cache = MemoryCache(strategy=CacheStrategy.LRU)
+        for i in range(10):
+            cache.set(f"k{i}", "x" * 100)
+            cache._cache[f"k{i}"].last_accessed = i
+
+        evicted = cache.trim(0.5)
+
+        assert evicted == 5
+        assert cache.keys() == [f"k{i}" for i in range(5, 10)]
+        assert cache.stats.memory_usage == 500
+        assert cache.stats.evictions == 5
+
+
+class TestRedisCache:
+    """Redis 缓存测试类"""
+
+    def test_unavailable_redis_degrades_to_miss(self):
+        """测试 Redis 不可用时读取按未命中处理、写入跳过"""
+        pytest.importorskip("redis")
+        cache = RedisCache(url="redis://127.0.0.1:1/0")
+
+        assert cache.get("missing") is None
+        assert cache.set("key", {"a": 1}) is False
+        assert cache.stats.misses == 1
@@ -2,9 +2,12 @@
 订阅转换器测试
 """
 
+import httpcore
+import httpx
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from app.core.converter import SubscriptionConverter
+from app.core.performance.dns_cache import CachingDNSTransport
 from app.models.schemas import ConversionRequest, ProxyNode, ProxyType
 
 
@@ -91,9 +94,8 @@ class TestSubscriptionConverter:
             include="HK|US"
         )
         
-        filtered_nodes = self.converter._apply_node_filters(nodes, request)
-        assert len(filtered_nodes) == 2
-        assert all("HK" in node.name or "US" in node.name for node in filtered_nodes)
+        allowed_names = self.converter._filter_node_names(nodes, request)
+        assert allowed_names == {"HK Node", "US Node"}
         
         # 测试排除过滤
         request = ConversionRequest(
@@ -101,9 +103,14 @@ class TestSubscriptionConverter:
             exclude="Test"
         )
         
-        filtered_nodes = self.converter._apply_node_filters(nodes, request)
-        assert len(filtered_nodes) == 3
-        assert all("Test" not in node.name for node in filtered_nodes)
+        allowed_names = self.converter._filter_node_names(nodes, request)
+        assert allowed_names == {"HK Node", "US Node", "CN Node"}
+        
+        # 按保留名称构建 Clash 代理
+        _, node_names, nodes_count = self.converter._build_clash_proxies(nodes, request, allowed_names)
+        assert nodes_count == 3
+        assert len(node_names) == 3
+        assert all("Test" not in name for name in node_names)
     
     def test_node_rename(self):
         """测试节点重命名"""
@@ -118,13 +125,13 @@ class TestSubscriptionConverter:
             emoji=True
         )
         
-        renamed_nodes = self.converter._apply_node_rename(nodes, request)
+        _, node_names, nodes_count = self.converter._build_clash_proxies(nodes, request, None)
         
         # 检查重命名效果（具体实现取决于重命名逻辑）
-        assert len(renamed_nodes) == 2
+        assert nodes_count == 2
         # 由于添加了 emoji，节点名称应该包含国旗
-        assert any("🇭🇰" in node.name for node in renamed_nodes if "香港" in node.name or "HK" in node.name)
-        assert any("🇺🇸" in node.name for node in renamed_nodes if "美国" in node.name or "US" in node.name)
+        assert any("🇭🇰" in name for name in node_names if "香港" in name or "HK" in name)
+        assert any("🇺🇸" in name for name in node_names if "美国" in name or "US" in name)
     
     @pytest.mark.asyncio
     async def test_convert_node_to_clash(self):
@@ -227,6 +234,19 @@ class TestSubscriptionConverter:
             assert result.success == False
             assert "转换失败" in result.message
     
+    @pytest.mark.asyncio
+    async def test_download_error_propagates(self):
+        """测试订阅下载失败时错误上抛，而不是当作空订阅"""
+        request = ConversionRequest(url=["https://invalid.url/test"])
+        client = MagicMock()
+        client.get = AsyncMock(side_effect=httpx.ConnectError("connection refused"))
+        
+        with patch.object(self.converter, '_get_client', return_value=client):
+            result = await self.converter.convert_subscription(request)
+        
+        assert result.success == False
+        assert "connection refused" in result.message
+    
     def test_clash_meta_features(self):
         """测试 Clash Meta 功能特性"""
         features = self.converter.get_clash_meta_features()
@@ -289,6 +309,78 @@ class TestSubscriptionConverter:
             assert "Sub2 Node1" in config
             assert "Sub2 Node2" in config
 
+    
+    @pytest.mark.asyncio
+    async def test_subscription_fetch_cached(self):
+        """测试订阅解析结果按链接缓存"""
+        import httpx
+        
+        response = httpx.Response(
+            200,
+            text="ss://YWVzLTI1Ni1nY206cGFzc3dvcmQ=@example.com:443#Test",
+            request=httpx.Request("GET", "https://example.com/sub")
+        )
+        client = MagicMock()
+        client.get = AsyncMock(return_value=response)
+        
+        with patch.object(self.converter, '_get_client', return_value=client):
+            first = await self.converter._fetch_and_parse_subscription("https://example.com/sub")
+            first[0].name = "Renamed"
+            second = await self.converter._fetch_and_parse_subscription("https://example.com/sub")
+        
+        assert client.get.await_count == 1
+        assert len(second) == 1
+        assert second[0].name == "Test"
+    
+    @pytest.mark.asyncio
+    async def test_remote_template_overrides(self):
+        """测试远程模板全局配置的类型转换与优先级"""
+        import yaml
+        
+        request = ConversionRequest(
+            url=["https://example.com/sub"],
+            remote_config="https://example.com/template.ini"
+        )
+        mock_remote_config = {
+            'template': {'mixed-port': '7893', 'ipv6': 'False', 'port': '1', 'clash_rule_base': 'base.yml'}
+        }
+        mock_nodes = [
+            ProxyNode(name="Test", type=ProxyType.SS, server="test.com", port=443)
+        ]
+        
+        with patch.object(self.converter, '_fetch_and_parse_subscription',
+                         return_value=mock_nodes), \
+             patch.object(self.converter.rule_processor, 'fetch_remote_config',
+                         return_value=mock_remote_config) as fetch:
+            first = await self.converter.convert_subscription(request)
+            second = await self.converter.convert_subscription(request)
+        
+        assert fetch.await_count == 1
+        config = yaml.safe_load(first.config)
+        assert config['mixed-port'] == 7893
+        assert config['ipv6'] is False
+        assert config['port'] == 7890
+        assert 'clash_rule_base' not in config
+        assert second.config == first.config
+
+    def test_client_respects_env_proxy(self, monkeypatch):
+        """测试配置环境变量代理时订阅拉取仍经过代理"""
+        monkeypatch.setenv('HTTPS_PROXY', 'http://proxy.example.com:3128')
+
+        client = self.converter._get_client()
+
+        transport = client._transport_for_url(httpx.URL('https://sub.example.com/link'))
+        assert isinstance(transport._pool, httpcore.AsyncHTTPProxy)
+        assert not isinstance(transport, CachingDNSTransport)
+
+    def test_client_uses_dns_cache_without_proxy(self, monkeypatch):
+        """测试未配置代理时使用 DNS 缓存传输层"""
+        monkeypatch.setattr('urllib.request.getproxies', lambda: {})
+
+        client = self.converter._get_client()
+
+        assert isinstance(client._transport_for_url(httpx.URL('https://sub.example.com/link')),
+                          CachingDNSTransport)
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
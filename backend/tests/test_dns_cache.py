@@ -0,0 +1,60 @@
+"""
+DNS 解析缓存测试
+"""
+
+import socket
+import httpcore
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.core.performance.dns_cache import CachingDNSBackend
+
+
+class TestCachingDNSBackend:
+    """DNS 缓存后端测试类"""
+
+    @pytest.mark.asyncio
+    async def test_resolve_cached(self):
+        """测试相同主机只解析一次"""
+        backend = CachingDNSBackend(ttl=60)
+        infos = [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('192.0.2.1', 443)),
+            (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('192.0.2.1', 443)),
+            (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('192.0.2.2', 443)),
+        ]
+
+        with patch('asyncio.BaseEventLoop.getaddrinfo', new=AsyncMock(return_value=infos)) as getaddrinfo:
+            first = await backend.resolve('example.com', 443)
+            second = await backend.resolve('example.com', 443)
+
+        assert first == ['192.0.2.1', '192.0.2.2']
+        assert second == first
+        assert getaddrinfo.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_ip_literal_not_resolved(self):
+        """测试 IP 地址无需解析"""
+        backend = CachingDNSBackend()
+
+        with patch('asyncio.BaseEventLoop.getaddrinfo', new=AsyncMock()) as getaddrinfo:
+            assert await backend.resolve('127.0.0.1', 80) == ['127.0.0.1']
+
+        getaddrinfo.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_connect_timeout_shared_across_addresses(self):
+        """测试多个地址共享同一个连接超时时限"""
+        inner = AsyncMock()
+        inner.connect_tcp.side_effect = httpcore.ConnectTimeout("timed out")
+        backend = CachingDNSBackend(backend=inner)
+        backend._cache[('example.com', 443)] = (float('inf'), ['192.0.2.1', '192.0.2.2', '192.0.2.3'])
+
+        with pytest.raises(httpcore.ConnectTimeout):
+            await backend.connect_tcp('example.com', 443, timeout=3.0)
+
+        timeouts = [call.kwargs['timeout'] for call in inner.connect_tcp.await_args_list]
+        assert len(timeouts) == 3
+        assert timeouts[0] == pytest.approx(1.0, abs=0.1)
+        assert all(t <= 3.0 for t in timeouts)
+        assert ('example.com', 443) not in backend._cache
+
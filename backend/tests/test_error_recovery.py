@@ -0,0 +1,60 @@
+"""
+错误恢复机制测试
+"""
+
+import pytest
+from app.core.compatibility.error_recovery import (
+    CircuitBreaker, CircuitOpenError, CircuitState
+)
+
+
+class TestCircuitBreaker:
+    """熔断器测试类"""
+
+    @pytest.mark.asyncio
+    async def test_async_function_failures_counted(self):
+        """测试协程函数的失败会计入熔断器"""
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60.0)
+
+        @breaker
+        async def failing():
+            raise ConnectionError("模拟网络错误")
+
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await failing()
+
+        assert breaker.failure_count == 2
+        with pytest.raises(CircuitOpenError):
+            await failing()
+
+    def test_sync_function_success(self):
+        """测试同步函数正常调用"""
+        breaker = CircuitBreaker()
+
+        @breaker
+        def add(a, b):
+            return a + b
+
+        assert add(1, 2) == 3
+        assert breaker.failure_count == 0
+
+    def test_recovery_timeout_backoff(self):
+        """测试半开探测失败后恢复等待时间指数增长"""
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=1.0,
+                                 max_recovery_timeout=3.0)
+
+        breaker._on_failure()
+        assert breaker._effective_recovery_timeout() == 1.0
+
+        breaker.state = CircuitState.HALF_OPEN
+        breaker._on_failure()
+        assert breaker._effective_recovery_timeout() == 2.0
+
+        breaker.state = CircuitState.HALF_OPEN
+        breaker._on_failure()
+        assert breaker._effective_recovery_timeout() == 3.0
+
+        breaker.state = CircuitState.HALF_OPEN
+        breaker._on_success()
+        assert breaker.consecutive_opens == 0
@@ -110,6 +110,18 @@ ss://YWVzLTI1Ni1nY206cGFzc3dvcmQ@example2.com:443#Node2"""
         assert nodes[0].name == "Node1"
         assert nodes[1].name == "Node2"
     
+    def test_bytes_subscription(self):
+        """测试直接传入字节形式的订阅内容"""
+        content = """ss://YWVzLTI1Ni1nY206cGFzc3dvcmQ@example1.com:443#Node1
+ss://YWVzLTI1Ni1nY206cGFzc3dvcmQ@example2.com:443#Node2"""
+        
+        # Base64 编码（去掉 padding）与原始文本两种形式
+        encoded_nodes = self.parser.parse_subscription(base64.b64encode(content.encode()).rstrip(b'='))
+        raw_nodes = self.parser.parse_subscription(content.encode())
+        
+        assert [node.name for node in encoded_nodes] == ["Node1", "Node2"]
+        assert [node.name for node in raw_nodes] == ["Node1", "Node2"]
+    
     def test_clash_config_parsing(self):
         """测试 Clash 配置解析"""
         clash_config = """
@@ -0,0 +1,87 @@
+"""
+sing-box 配置生成器测试
+"""
+
+import pytest
+from app.core.generators.singbox_generator import SingBoxConfigGenerator, register_singbox_generator
+from app.core.protocol_parser_interface import ConfigFormat, protocol_registry
+from app.models.schemas import ProxyNode, ProxyType
+
+
+class TestSingBoxConfigGenerator:
+    """sing-box 配置生成器测试类"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.generator = SingBoxConfigGenerator()
+
+    def test_generate_full_config(self):
+        """测试生成完整配置并跳过不支持的节点"""
+        nodes = [
+            ProxyNode(name="SS", type=ProxyType.SS, server="a.com", port=8388,
+                      cipher="aes-256-gcm", password="p"),
+            ProxyNode(name="VMess", type=ProxyType.VMESS, server="b.com", port=443, uuid="u",
+                      tls=True, network="ws", path="/ws", host="cdn.com"),
+            ProxyNode(name="SSR", type=ProxyType.SSR, server="c.com", port=443),
+        ]
+
+        result = self.generator.generate_full_config(nodes, {'log_level': 'debug'})
+
+        assert result.is_valid
+        config = result.config
+        assert config['log']['level'] == 'debug'
+        outbounds = {o['tag']: o for o in config['outbounds']}
+        assert outbounds['proxy']['outbounds'] == ['auto', 'SS', 'VMess']
+        assert 'SSR' not in outbounds
+        assert outbounds['SS'] == {
+            'type': 'shadowsocks', 'tag': 'SS', 'server': 'a.com', 'server_port': 8388,
+            'method': 'aes-256-gcm', 'password': 'p'
+        }
+        assert outbounds['VMess']['tls'] == {'enabled': True, 'server_name': 'b.com', 'insecure': False}
+        assert outbounds['VMess']['transport'] == {'type': 'ws', 'path': '/ws', 'headers': {'Host': 'cdn.com'}}
+
+    def test_hysteria_bandwidth(self):
+        """测试 Hysteria 带宽字段解析"""
+        node = ProxyNode(name="HY", type=ProxyType.HYSTERIA2, server="h.com", port=443,
+                         up="50 Mbps", down="invalid")
+
+        result = self.generator.generate_proxy_config(node, ConfigFormat.SING_BOX)
+
+        assert result.is_valid
+        assert result.config['up_mbps'] == 50
+        assert result.config['down_mbps'] == 100
+
+    def test_no_valid_nodes(self):
+        """测试没有有效节点时返回错误"""
+        nodes = [ProxyNode(name="WG", type=ProxyType.WIREGUARD, server="w.com", port=51820)]
+
+        result = self.generator.generate_full_config(nodes)
+
+        assert not result.is_valid
+        assert result.error == "没有有效的代理节点"
+
+    def test_to_json(self):
+        """测试配置序列化保留非 ASCII 字符"""
+        import json
+
+        config = {'outbounds': [{'tag': '🇭🇰 香港'}]}
+
+        assert json.loads(self.generator.to_json(config)) == config
+        assert '🇭🇰 香港' in self.generator.to_json(config, indent=True)
+
+    @pytest.mark.asyncio
+    async def test_generate_full_config_async(self):
+        """测试在工作线程中生成完整配置"""
+        nodes = [ProxyNode(name="Trojan", type=ProxyType.TROJAN, server="t.com", port=443, password="p")]
+
+        result = await self.generator.generate_full_config_async(nodes)
+
+        assert result.is_valid
+        assert result.config == self.generator.generate_full_config(nodes).config
+
+    def test_register_singbox_generator_singleton(self):
+        """测试重复注册返回同一生成器实例"""
+        generator = register_singbox_generator()
+
+        assert register_singbox_generator() is generator
+        assert protocol_registry.get_generator('sing-box') is generator
@@ -0,0 +1,75 @@
+"""
+版本管理器测试
+"""
+
+from app.core.compatibility.version_manager import VersionManager, CompatibilityLevel
+
+
+class TestVersionManager:
+    """版本管理器测试类"""
+
+    def setup_method(self):
+        """测试前准备"""
+        self.manager = VersionManager()
+
+    def test_check_compatibility_explicit_rule(self):
+        """测试命中显式兼容性规则"""
+        rule = self.manager.check_compatibility('TUIC', '4', '5')
+        assert rule.compatibility_level == CompatibilityLevel.PARTIAL
+        assert rule.field_mappings['token'] == 'uuid'
+
+    def test_check_compatibility_by_version(self):
+        """测试按版本号比较兼容性"""
+        assert self.manager.check_compatibility('vless', '1', '1').compatibility_level == CompatibilityLevel.FULL
+        assert self.manager.check_compatibility('vless', '1.2', '1.10').compatibility_level == CompatibilityLevel.PARTIAL
+        assert self.manager.check_compatibility('vless', '2', '1.9').compatibility_level == CompatibilityLevel.DEGRADED
+        assert self.manager.check_compatibility('vless', 'x y', '1').compatibility_level == CompatibilityLevel.INCOMPATIBLE
+
+    def test_latest_version_and_migration_path(self):
+        """测试最新版本与迁移路径"""
+        assert self.manager.get_latest_version('hysteria') == '2'
+        assert self.manager.recommend_migration_path('hysteria', '1', '2') == ['1', '2']
+
+    def test_numeric_and_pep440_versions_agree(self):
+        """测试整数编码比较与 packaging 比较结果一致"""
+        from packaging.version import parse
+
+        cases = [('1', '1.0'), ('1.2', '1.10'), ('2.0.1', '2.0'), ('1.0rc1', '1.0')]
+        for source, target in cases:
+            level = self.manager.check_compatibility('vless', source, target).compatibility_level
+            if parse(source) == parse(target):
+                assert level == CompatibilityLevel.FULL
+            elif parse(source) < parse(target):
+                assert level == CompatibilityLevel.PARTIAL
+            else:
+                assert level == CompatibilityLevel.DEGRADED
+
+    def test_migrate_config_nested_fields(self):
+        """测试嵌套字段迁移"""
+        config = {
+            'name': 'test',
+            'server': 'example.com',
+            'port': 443,
+            'skip-cert-verify': True,
+            'ws-opts': {'path': '/ws', 'headers': {'Host': 'cdn.example.com'}}
+        }
+
+        migrated, warnings = self.manager.migrate_config(config, 'clash', 'singbox')
+
+        assert migrated['server_port'] == 443
+        assert migrated['tls'] == {'insecure': True}
+        assert migrated['transport'] == {'path': '/ws', 'headers': {'Host': 'cdn.example.com'}}
+        assert migrated['name'] == 'test'
+        assert warnings == []
+
+    def test_validate_config_compatibility(self):
+        """测试配置兼容性验证"""
+        config = {'name': 'n', 'server': 's', 'port': 0, 'token': 't'}
+
+        warnings = self.manager.validate_config_compatibility(config, 'clash', 'tuic', '4')
+
+        assert warnings == ['缺少必需字段: port', "字段 'token' 已弃用，建议移除"]
+        assert self.manager.validate_config_compatibility(
+            {'name': 'n', 'server': 's', 'server_port': 1, 'uuid': 'u', 'password': 'p'},
+            'sing-box', 'tuic', '5'
+        ) == []